@@ -6,24 +6,48 @@ ValutaTrade Hub - Торговая платформа для виртуальн
 
 import sys
 
+from valutatrade_hub import __version__
 from valutatrade_hub.cli.interface import run_cli
 from valutatrade_hub.logging_config import setup_logging
 
+# Справка для запуска с флагами: печатается без инициализации логов и менеджеров
+STATIC_HELP = """ValutaTrade Hub — торговая платформа для виртуального портфеля валют.
+
+Использование: python3 -m main [-h | --help] [-v | --version] [-q | --quiet]
+
+Без аргументов запускается интерактивная консоль.
+  -q, --quiet   не выводить стартовый баннер
+Список команд консоли: введите 'help' после запуска."""
+
 
 def main() -> None:
     """Основная функция приложения."""
-    print("🚀 Запуск ValutaTrade Hub...")
+    args = sys.argv[1:]
+
+    # Быстрый путь: справка и версия не требуют логирования и загрузки данных
+    if any(a in ("-h", "--help") for a in args):
+        print(STATIC_HELP)
+        return
+    if any(a in ("-v", "--version") for a in args):
+        print(f"ValutaTrade Hub {__version__}")
+        return
+
+    quiet = any(a in ("-q", "--quiet") for a in args)
+
+    if not quiet:
+        print("🚀 Запуск ValutaTrade Hub...")
 
-    # Показать информацию о Parser Service
-    print("📡 Parser Service: получение курсов с внешних API")
-    print("   • CoinGecko API: криптовалюты (BTC, ETH, LTC, XRP, ADA, SOL, DOT)")
-    print("   • ExchangeRate-API: фиатные валюты (EUR, GBP, RUB, JPY, CHF) - режим заглушки")
-    print("   • Для реальных данных зарегистрируйтесь на exchangerate-api.com")
-    print()
+        # Показать информацию о Parser Service
+        print("📡 Parser Service: получение курсов с внешних API")
+        print("   • CoinGecko API: криптовалюты (BTC, ETH, LTC, XRP, ADA, SOL, DOT)")
+        print("   • ExchangeRate-API: фиатные валюты (EUR, GBP, RUB, JPY, CHF) - режим заглушки")
+        print("   • Для реальных данных зарегистрируйтесь на exchangerate-api.com")
+        print()
 
     # Инициализация системы логирования
     setup_logging(log_level="INFO", log_dir="logs", json_format=False)
-    print("📝 Система логирования инициализирована")
+    if not quiet:
+        print("📝 Система логирования инициализирована")
 
     try:
         run_cli()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    """Каждый тест работает в пустом каталоге: data/ и logs/ создаются во временной папке."""
+    monkeypatch.chdir(tmp_path)
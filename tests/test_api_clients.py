@@ -0,0 +1,75 @@
+import json
+
+from valutatrade_hub.parser_service import api_clients
+from valutatrade_hub.parser_service.api_clients import CoinGeckoClient
+
+
+def make_client(monkeypatch, response=None):
+    """Клиент CoinGecko без сети: _make_request считает вызовы и возвращает response."""
+    client = CoinGeckoClient()
+    calls = []
+    if response is None:
+        response = {"bitcoin": {"usd": 60000.0}, "ethereum": {"usd": 3000.0}}
+
+    def fake_request(url):
+        calls.append(url)
+        return response
+
+    monkeypatch.setattr(client, "_make_request", fake_request)
+    return client, calls
+
+
+def test_recent_response_is_served_from_disk(monkeypatch):
+    client, calls = make_client(monkeypatch)
+
+    first = client.fetch_rates()
+    # Новый экземпляр (как при следующем запуске CLI) читает тот же файл
+    second_client, second_calls = make_client(monkeypatch)
+
+    assert first == {"BTC_USD": 60000.0, "ETH_USD": 3000.0}
+    assert second_client.fetch_rates() == first
+    assert len(calls) == 1 and second_calls == []
+
+
+def test_expired_entry_is_ignored(monkeypatch):
+    client, calls = make_client(monkeypatch)
+    client.fetch_rates()
+
+    now = api_clients.time.time()
+    monkeypatch.setattr(api_clients.time, "time", lambda: now + client.cache_ttl)
+    client.fetch_rates()
+
+    assert len(calls) == 2
+
+
+def test_empty_or_foreign_entries_are_ignored(monkeypatch, tmp_path):
+    client, calls = make_client(monkeypatch, response={})
+
+    # Пустой ответ не кешируется
+    assert client.fetch_rates() == {}
+    client.fetch_rates()
+    assert len(calls) == 2
+
+    # Запись с пустыми курсами и запись для другого URL не используются
+    cache_file = tmp_path / client.cache_path
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    for entry in (
+        {"url": calls[0], "fetched_at": api_clients.time.time(), "rates": {}},
+        {"url": "https://example.invalid", "fetched_at": api_clients.time.time(), "rates": {"BTC_USD": 1.0}},
+    ):
+        cache_file.write_text(json.dumps(entry), encoding="utf-8")
+        client.fetch_rates()
+    assert len(calls) == 4
+
+
+def test_use_cache_false_bypasses_and_refreshes_cache(monkeypatch):
+    client, calls = make_client(monkeypatch)
+    client.fetch_rates()
+
+    client.fetch_rates(use_cache=False)
+    assert len(calls) == 2
+
+    with open(client.cache_path, encoding="utf-8") as f:
+        assert json.load(f)["url"] == calls[-1]
+    client.fetch_rates()
+    assert len(calls) == 2
@@ -0,0 +1,206 @@
+import threading
+
+from valutatrade_hub.cli import interface
+from valutatrade_hub.cli.interface import TradingCLI
+from valutatrade_hub.core.exceptions import ApiRequestError
+
+
+class FakeUpdater:
+    """Заглушка RatesUpdater: считает вызовы и возвращает пронумерованные статусы."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.last_update_time = None
+        self.status_calls = 0
+        self.update_calls = 0
+
+    def get_update_status(self):
+        self.status_calls += 1
+        return {"total_records": self.status_calls}
+
+    def run_update(self, preloaded_crypto_rates=None, use_cache=True):
+        self.update_calls += 1
+        self.last_update_time = self.update_calls
+        return {"pairs": {}, "call": self.update_calls}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cli(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(interface.time, "monotonic", clock)
+    cli = TradingCLI()
+    cli._rates_updater = FakeUpdater(cli.history_storage)
+    return cli, clock
+
+
+def test_status_is_cached_while_data_is_unchanged(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+
+    assert cli._get_update_status() == {"total_records": 1}
+    clock.now += 3600
+    assert cli._get_update_status() == {"total_records": 1}
+    assert cli.rates_updater.status_calls == 1
+
+
+def test_status_is_reread_after_history_changes(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+    storage = cli.history_storage
+
+    cli._get_update_status()
+    for from_currency in ("BTC", "ETH"):
+        record = storage.create_exchange_rate_record(from_currency, "USD", 100.0, "CoinGecko")
+        assert storage.save_exchange_rate_record(record)
+        cli._get_update_status()
+
+    assert cli.rates_updater.status_calls == 3
+
+
+def test_repeat_update_within_ttl_reuses_last_result(monkeypatch, capsys):
+    cli, clock = make_cli(monkeypatch)
+    cli._update_cache_ttl = 60.0
+
+    first = cli._run_update()
+    clock.now += 10
+    assert cli._run_update() is first
+    assert cli.rates_updater.update_calls == 1
+    assert "используется результат последнего обновления" in capsys.readouterr().out
+
+    clock.now += 60
+    cli._run_update()
+    assert cli.rates_updater.update_calls == 2
+
+
+def test_forced_update_bypasses_ttl_and_becomes_last_update(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+    cli._update_cache_ttl = 60.0
+
+    cli._run_update()
+    forced = cli._run_update(force=True)
+    assert cli.rates_updater.update_calls == 2
+    # Следующее неявное обновление берет результат принудительного
+    assert cli._run_update() is forced
+    assert cli.rates_updater.update_calls == 2
+
+
+def test_status_is_reread_after_update(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+
+    cli._get_update_status()
+    cli._run_update(force=True)
+    assert cli._get_update_status() == {"total_records": 2}
+
+
+class FakeRateManager:
+    """Заглушка RateManager: считает запросы курса, при fail=True бросает ApiRequestError."""
+
+    def __init__(self):
+        self.rate_calls = 0
+        self.fail = False
+
+    def get_rate(self, from_currency, to_currency):
+        self.rate_calls += 1
+        if self.fail:
+            raise ApiRequestError("сбой")
+        return True, "", 0.5, "2025-10-10T12:00:00"
+
+    def reload_rates_cache(self):
+        pass
+
+    def get_last_refresh_display(self):
+        return "2025-10-10 12:00:00"
+
+
+def make_getrate_cli(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+    cli._rate_manager = FakeRateManager()
+    cli._rate_cache_ttl = 30.0
+    return cli, clock
+
+
+def test_getrate_is_cached_until_ttl(monkeypatch, capsys):
+    cli, clock = make_getrate_cli(monkeypatch)
+
+    cli.do_getrate("--from eur --to usd")
+    clock.now += 10
+    cli.do_getrate("--from EUR --to USD")
+    assert cli.rate_manager.rate_calls == 1
+    assert capsys.readouterr().out.count("Курс EUR→USD: 0.50000000") == 2
+
+    clock.now += 30
+    cli.do_getrate("--from EUR --to USD")
+    assert cli.rate_manager.rate_calls == 2
+
+
+def test_getrate_api_error_drops_cached_pair(monkeypatch):
+    cli, clock = make_getrate_cli(monkeypatch)
+
+    cli.do_getrate("--from EUR --to USD")
+    clock.now += 31
+    cli.rate_manager.fail = True
+    cli.do_getrate("--from EUR --to USD")
+
+    assert ("EUR", "USD") not in cli._rate_cache
+
+
+def test_update_rates_clears_getrate_cache(monkeypatch):
+    cli, clock = make_getrate_cli(monkeypatch)
+
+    cli.do_getrate("--from EUR --to USD")
+    cli.do_updaterates("")
+    cli.do_getrate("--from EUR --to USD")
+
+    assert cli.rate_manager.rate_calls == 2
+
+
+def test_concurrent_updates_run_once(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+    cli._update_cache_ttl = 60.0
+    updater = cli.rates_updater
+    started = threading.Event()
+    release = threading.Event()
+    original_run_update = updater.run_update
+
+    def slow_run_update(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return original_run_update(*args, **kwargs)
+
+    updater.run_update = slow_run_update
+    results = []
+    first = threading.Thread(target=lambda: results.append(cli._run_update()))
+    first.start()
+    assert started.wait(5)
+    # Второе обновление ждет первое и берет его результат, а не запрашивает API повторно
+    second = threading.Thread(target=lambda: results.append(cli._run_update()))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert updater.update_calls == 1
+    assert len(results) == 2 and results[0] is results[1]
+
+
+def test_implicit_refresh_goes_through_run_update(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+    cli._update_cache_ttl = 60.0
+
+    cli._get_update_status()
+    assert cli.rate_manager.update_rates()
+    assert cli._get_update_status() == {"total_records": 2}
+    # Повторное неявное обновление в пределах TTL берет результат предыдущего
+    assert cli.rate_manager.update_rates()
+    assert cli.rates_updater.update_calls == 1
+
+
+def test_trades_use_session_rate_manager(monkeypatch):
+    cli, clock = make_cli(monkeypatch)
+
+    assert cli.portfolio_manager._get_rate_manager() is cli.rate_manager
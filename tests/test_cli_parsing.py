@@ -0,0 +1,53 @@
+import argparse
+
+import pytest
+
+from valutatrade_hub.cli.interface import TradingCLI, _build_parser
+
+
+def test_option_value_may_start_with_dash():
+    parser = _build_parser("login", "--username", "--password")
+
+    ns = parser.parse_args(["--username", "bob", "--password", "-abc"])
+
+    assert (ns.username, ns.password) == ("bob", "-abc")
+
+
+def test_option_value_in_equals_form():
+    parser = _build_parser("login", "--username", "--password")
+
+    ns = parser.parse_args(["--username=bob", "--password=-abc"])
+
+    assert (ns.username, ns.password) == ("bob", "-abc")
+
+
+def test_other_flag_is_not_taken_as_value():
+    parser = _build_parser("login", "--username", "--password")
+
+    with pytest.raises(argparse.ArgumentError):
+        parser.parse_args(["--username", "--password", "x"])
+
+
+def test_currency_values_are_normalised():
+    parser = _build_parser("getrate", "--from", "--to")
+
+    ns = parser.parse_args(["--from", "usd", "--to", "btc"])
+
+    assert (ns.__dict__["from"], ns.to) == ("USD", "BTC")
+
+
+def test_login_credentials_with_leading_dash():
+    cli = TradingCLI()
+
+    assert cli._parse_credentials("--username bob --password -abc", "login") == ("bob", "-abc")
+
+
+@pytest.mark.parametrize("limit", ["0", "-3"])
+def test_view_history_rejects_non_positive_limit(limit, capsys):
+    cli = TradingCLI()
+
+    cli.do_viewhistory(f"--currency BTC --limit {limit}")
+
+    out = capsys.readouterr().out
+    assert "limit должен быть положительным числом" in out
+    assert "История курса" not in out
@@ -0,0 +1,41 @@
+from valutatrade_hub.core import utils
+from valutatrade_hub.core.utils import CurrencyService
+
+
+def make_service(monkeypatch):
+    calls = []
+    monkeypatch.setattr(CurrencyService, "_simulate_api_call", staticmethod(calls.append))
+    return CurrencyService(), calls
+
+
+def test_found_rate_is_cached_until_ttl(monkeypatch):
+    service, calls = make_service(monkeypatch)
+    now = [100.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+
+    assert service.get_exchange_rate("usd", "eur") == 0.92
+    assert service.get_exchange_rate("USD", "EUR") == 0.92
+    assert len(calls) == 1
+
+    now[0] += CurrencyService._CACHE_TTL
+    service.get_exchange_rate("USD", "EUR")
+    assert len(calls) == 2
+
+
+def test_missing_rate_is_not_cached(monkeypatch):
+    service, calls = make_service(monkeypatch)
+
+    assert service.get_exchange_rate("XYZ", "USD") is None
+    assert service.get_exchange_rate("XYZ", "USD") is None
+    assert service.get_exchange_rates(["XYZ"], "USD") == {}
+
+    assert len(calls) == 3
+    assert ("XYZ", "USD") not in service._cache
+
+
+def test_batch_lookup_reuses_cached_rates(monkeypatch):
+    service, calls = make_service(monkeypatch)
+
+    assert service.get_exchange_rates(["BTC", "ETH"], "USD") == {"BTC": 40000.0, "ETH": 3720.0}
+    assert service.get_exchange_rates(["BTC", "ETH"], "USD") == {"BTC": 40000.0, "ETH": 3720.0}
+    assert len(calls) == 1
@@ -0,0 +1,40 @@
+import logging
+import queue
+import sys
+
+from valutatrade_hub.logging_config import _RecordQueueHandler
+
+
+def make_logger(name):
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.handlers = [_RecordQueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    return logger, log_queue
+
+
+def test_message_is_formatted_on_caller_thread():
+    logger, log_queue = make_logger("tests.queue_handler.message")
+    payload = {"rate": 1}
+
+    logger.info("Курсы: %s", payload)
+    payload["rate"] = 2
+
+    record = log_queue.get_nowait()
+    assert record.msg == "Курсы: {'rate': 1}"
+    assert record.args is None
+
+
+def test_exc_info_and_extra_fields_are_kept():
+    logger, log_queue = make_logger("tests.queue_handler.extra")
+
+    try:
+        raise ValueError("сбой")
+    except ValueError:
+        logger.error("Ошибка", exc_info=True, extra={"action": "BUY"})
+        exc_type = sys.exc_info()[0]
+
+    record = log_queue.get_nowait()
+    assert record.exc_info[0] is exc_type
+    assert record.action == "BUY"
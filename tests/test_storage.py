@@ -0,0 +1,86 @@
+import pytest
+
+from valutatrade_hub.parser_service.storage import ExchangeRatesStorage
+
+
+def make_record(storage, from_currency="BTC", rate=100.0):
+    return storage.create_exchange_rate_record(from_currency, "USD", rate, "CoinGecko", meta={"raw_id": "bitcoin"})
+
+
+def test_mutating_loaded_history_does_not_leak_into_cache():
+    storage = ExchangeRatesStorage()
+    record = make_record(storage)
+    assert storage.save_exchange_rate_record(record)
+
+    first = storage.load_exchange_rates()
+    first[record["id"]]["rate"] = -1.0
+    first[record["id"]]["meta"]["raw_id"] = "changed"
+    first["extra"] = {}
+
+    second = storage.load_exchange_rates()
+    assert second[record["id"]]["rate"] == 100.0
+    assert second[record["id"]]["meta"]["raw_id"] == "bitcoin"
+    assert "extra" not in second
+
+
+def test_history_cache_is_invalidated_when_file_changes():
+    storage = ExchangeRatesStorage()
+    first = make_record(storage, "BTC")
+    assert storage.save_exchange_rate_record(first)
+    assert set(storage.load_exchange_rates()) == {first["id"]}
+
+    # Запись другим экземпляром (как из другого процесса) меняет файл
+    second = make_record(storage, "ETH")
+    assert ExchangeRatesStorage().save_exchange_rate_record(second)
+
+    assert set(storage.load_exchange_rates()) == {first["id"], second["id"]}
+
+
+def test_rate_history_matches_full_sort():
+    storage = ExchangeRatesStorage()
+    timestamps = [f"2025-10-{day:02d}T12:00:00Z" for day in (5, 1, 9, 3, 7, 2, 8)]
+    history = {}
+    for i, timestamp in enumerate(timestamps):
+        for from_currency in ("BTC", "ETH"):
+            record_id = f"{from_currency}_USD_{timestamp}"
+            history[record_id] = {
+                "id": record_id,
+                "from_currency": from_currency,
+                "to_currency": "USD",
+                "rate": float(i),
+                "timestamp": timestamp,
+                "source": "CoinGecko",
+                "meta": {},
+            }
+    assert storage._atomic_write(storage.exchange_rates_file, history)
+
+    expected = sorted(
+        (record for record in history.values() if record["from_currency"] == "BTC"),
+        key=lambda record: record["timestamp"],
+        reverse=True,
+    )
+    for limit in (1, 3, 7, 20):
+        assert storage.get_rate_history("btc", "usd", limit=limit) == expected[:limit]
+
+
+def test_history_view_is_shared_and_read_only():
+    storage = ExchangeRatesStorage()
+    record = make_record(storage)
+    assert storage.save_exchange_rate_record(record)
+
+    first = storage.load_exchange_rates_view()
+    second = storage.load_exchange_rates_view()
+    # Неизмененный файл: записи берутся из кэша без копирования
+    assert first[record["id"]] is second[record["id"]]
+    with pytest.raises(TypeError):
+        first["extra"] = {}
+
+
+def test_rate_history_results_do_not_leak_into_cache():
+    storage = ExchangeRatesStorage()
+    record = make_record(storage)
+    assert storage.save_exchange_rate_record(record)
+
+    storage.get_rate_history("BTC")[0]["meta"]["raw_id"] = "changed"
+
+    assert storage.get_rate_history("BTC")[0]["meta"]["raw_id"] == "bitcoin"
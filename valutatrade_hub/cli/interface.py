@@ -1,8 +1,14 @@
+import argparse
 import cmd
+import collections
+import functools
+import math
+import os
 import shlex
-from datetime import datetime
-
-from prettytable import PrettyTable
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
 
 from ..core.exceptions import (
     ApiRequestError,
@@ -12,8 +18,311 @@ from ..core.exceptions import (
     UserNotAuthenticatedError,
     ValutaTradeError,
 )
-from ..core.usecases import PortfolioManager, RateManager, UserManager
-from ..core.utils import CurrencyService, InputValidator
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _CommandParser(argparse.ArgumentParser):
+    """ArgumentParser для команд консоли: ошибка разбора не завершает процесс."""
+
+    def parse_args(self, args=None, namespace=None):
+        """
+        Разбирает токены команды, допуская значения флагов, начинающиеся с '-'.
+
+        Пара '--flag value' склеивается в '--flag=value', поэтому, например,
+        'login --username bob --password -abc' не считается ошибкой формата.
+        Токен, совпадающий с другим флагом команды, значением не считается.
+
+        Args:
+            args: Токены аргументов команды.
+            namespace: Пространство имен для результата (как в argparse).
+
+        Returns:
+            argparse.Namespace: Разобранные аргументы.
+        """
+        if args is None:
+            return super().parse_args(args, namespace)
+        options = self._option_string_actions
+        tokens = list(args)
+        joined = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in options and i + 1 < len(tokens) and tokens[i + 1] not in options:
+                joined.append(f"{token}={tokens[i + 1]}")
+                i += 2
+            else:
+                joined.append(token)
+                i += 1
+        return super().parse_args(joined, namespace)
+
+    def error(self, message: str) -> None:
+        raise argparse.ArgumentError(None, message)
+
+
+# Флаги, значения которых — коды валют (нормализуются парсером, см. _currency_code)
+_CURRENCY_OPTIONS = frozenset(("--currency", "--base", "--from", "--to"))
+
+
+def _build_parser(prog: str, *options: str) -> argparse.ArgumentParser:
+    """
+    Создает парсер флагов вида --name <value> для одной команды.
+
+    Значения флагов из _CURRENCY_OPTIONS сразу приводятся к верхнему регистру.
+
+    Args:
+        prog: Имя команды.
+        options: Флаги команды (например, '--username').
+
+    Returns:
+        argparse.ArgumentParser: Парсер, который бросает ArgumentError вместо выхода.
+    """
+    parser = _CommandParser(prog=prog, add_help=False, allow_abbrev=False)
+    for option in options:
+        parser.add_argument(option, type=_currency_code if option in _CURRENCY_OPTIONS else None)
+    return parser
+
+
+def _split(line: str) -> list:
+    """
+    Разбивает аргументы команды на токены.
+
+    Полноценный shlex нужен только при кавычках или экранировании,
+    в остальных случаях достаточно разбиения по пробелам.
+
+    Args:
+        line: Строка аргументов команды.
+
+    Returns:
+        list: Список токенов.
+    """
+    if '"' in line or "'" in line or '\\' in line:
+        return shlex.split(line)
+    return line.split()
+
+
+@functools.lru_cache(maxsize=64)
+def _split_cached(line: str) -> tuple:
+    """
+    Кеширующий вариант _split для повторяющихся команд сессии.
+
+    Не используется для register/login, чтобы пароли не оставались в кеше.
+
+    Args:
+        line: Строка аргументов команды.
+
+    Returns:
+        tuple: Неизменяемый кортеж токенов.
+    """
+    return tuple(_split(line))
+
+
+@functools.lru_cache(maxsize=128)
+def _currency_code(value: str) -> str:
+    """
+    Нормализует код валюты из аргументов команды.
+
+    Результат кешируется: повторяющиеся коды (USD, BTC, EUR) не приводятся
+    к верхнему регистру заново.
+
+    Args:
+        value: Код валюты в любом регистре.
+
+    Returns:
+        str: Интернированный код в верхнем регистре (быстрые поиски в словарях курсов).
+    """
+    return sys.intern(value.upper())
+
+
+@functools.lru_cache(maxsize=256)
+def _format_updated_at(updated_at: str) -> str:
+    """
+    Форматирует ISO-время обновления курса для вывода getrate.
+
+    Все пары одного снимка курсов обычно имеют одинаковое время,
+    поэтому результат кешируется по исходной строке.
+
+    Args:
+        updated_at: Время обновления в ISO-формате.
+
+    Returns:
+        str: Время в виде 'YYYY-MM-DD HH:MM:SS' или исходная строка, если она не разбирается.
+    """
+    from datetime import datetime
+
+    try:
+        return datetime.fromisoformat(updated_at).strftime("%Y-%m-%d %H:%M:%S")
+    except (ValueError, TypeError):
+        return updated_at
+
+
+def _history_row(record: Dict) -> list:
+    """
+    Готовит строку таблицы view-history из записи истории курсов.
+
+    Args:
+        record: Запись из exchange_rates.json.
+
+    Returns:
+        list: [время, курс, источник, сокращенный ID].
+    """
+    # Время без долей секунды и зоны: 'YYYY-MM-DDTHH:MM:SS...' -> 'YYYY-MM-DD HH:MM:SS'
+    timestamp = record['timestamp']
+    display_time = timestamp.replace('T', ' ', 1)[:19] if 'T' in timestamp else timestamp
+    rate = record['rate']
+    record_id = record['id']
+    return [
+        display_time,
+        f"{rate:.6f}" if rate < 1 else f"{rate:.2f}",
+        record['source'],
+        # Обрезаем ID для лучшего отображения
+        record_id[:20] + "..." if len(record_id) > 20 else record_id,
+    ]
+
+
+# Маркеры успеха/ошибки: для вывода в файл/канал или при NO_COLOR — без эмодзи
+if os.environ.get("NO_COLOR") or not sys.stdout.isatty():
+    _OK, _ERR = "OK:", "ERR:"
+else:
+    _OK, _ERR = "✅", "❌"
+
+# Криптовалюты (CoinGecko) и фиатные валюты (ExchangeRate-API), которые обновляет Parser Service
+_CRYPTO = frozenset(("BTC", "ETH", "LTC", "XRP", "ADA", "SOL", "DOT"))
+_FIAT = frozenset(("EUR", "GBP", "RUB", "JPY", "CHF"))
+
+# Подсказки к сообщениям об ошибках (см. TradingCLI._handle_exception)
+_EXCEPTION_HINTS = {
+    InsufficientFundsError: "   Проверьте баланс кошелька и введите меньшую сумму.",
+    CurrencyNotFoundError: (
+        "   Для просмотра списка поддерживаемых валют используйте команду:\n"
+        "   list-currencies"
+    ),
+    ApiRequestError: (
+        "   Пожалуйста, повторите попытку позже.\n"
+        "   Проверьте подключение к сети и доступность сервиса."
+    ),
+    InvalidAmountError: "   Введите положительное число больше нуля.",
+    UserNotAuthenticatedError: "   Используйте команду login для входа в систему.",
+    ValutaTradeError: None,
+}
+
+# Шаблоны вывода портфеля (разбираются один раз при импорте модуля)
+_PORTFOLIO_ROW = "  - {}: {:,.4f}  → {:,.2f} {}".format
+_PORTFOLIO_TOTAL = "💎 ИТОГО: {:,.2f} {}".format
+_SEP = '=' * 50
+
+# view-history: начиная с этого числа записей строки пишутся в stdout по одной, без PrettyTable
+_HISTORY_STREAM_THRESHOLD = 100
+# Строка потокового вывода view-history с фиксированной шириной колонок
+_HISTORY_LINE = "{:<19}  {:>15}  {:<12}  {}\n".format
+
+# Время жизни курса, закешированного командой getrate (секунды), если не задано в настройках
+_RATE_CACHE_TTL = 30.0
+
+# Интервал, в течение которого повторное обновление курсов берет результат предыдущего (секунды)
+_UPDATE_CACHE_TTL = 60.0
+
+
+# Подсказки по использованию команд (выводятся при ошибках разбора аргументов)
+_USAGE = {
+    'register': (
+        "Использование: register --username <username> --password <password>\n"
+        "Пример: register --username alice --password 1234"
+    ),
+    'login': (
+        "Использование: login --username <username> --password <password>\n"
+        "Пример: login --username alice --password 1234"
+    ),
+    'showportfolio': (
+        "Использование: showportfolio [--base <currency_code>]\n"
+        "Пример: showportfolio\n"
+        "Пример: showportfolio --base EUR"
+    ),
+    'buy': (
+        "Использование: buy --currency <currency_code> --amount <amount>\n"
+        "Пример: buy --currency BTC --amount 0.05"
+    ),
+    'sell': (
+        "Использование: sell --currency <currency_code> --amount <amount>\n"
+        "Пример: sell --currency BTC --amount 0.01"
+    ),
+    'getrate': (
+        "Использование: getrate --from <currency_code> --to <currency_code>\n"
+        "Пример: getrate --from USD --to BTC\n"
+        "Пример: getrate --from EUR --to USD"
+    ),
+    'show-rates': (
+        "Использование: show-rates [--currency <code>] [--top <N>] [--base <currency>]"
+    ),
+    'update-rates': (
+        "Использование: update-rates [--source <coingecko|exchangerate>]\n"
+        "Пример: update-rates\n"
+        "Пример: update-rates --source coingecko"
+    ),
+    'view-history': (
+        "Использование: view-history --currency <code> [--limit N]\n"
+        "Пример: view-history --currency BTC --limit 5"
+    ),
+    'cleanup-history': (
+        "Использование: cleanup-history [--days N]\n"
+        "Пример: cleanup-history --days 30"
+    ),
+    'view-logs': (
+        "Использование: view-logs [--lines N]\n"
+        "Пример: view-logs --lines 10"
+    ),
+}
+
+# Ошибка формата команды вместе с подсказкой (одна строка на каждую команду)
+_FORMAT_ERROR = {
+    command: f"{_ERR} Ошибка: неверный формат команды\n{usage}"
+    for command, usage in _USAGE.items()
+}
+
+
+# Строки таблицы справки: (команда, описание, пример, возможные ошибки)
+_HELP_COMMANDS = (
+    # Основные команды пользователя
+    ("register", "Регистрация нового пользователя", "register --username alice --password 1234", "Username занят, пароль короткий"),
+    ("login", "Вход в систему", "login --username alice --password 1234", "Пользователь не найден, неверный пароль"),
+    ("logout", "Выход из системы", "logout", "-"),
+    ("whoami", "Инфо о текущем пользователе", "whoami", "-"),
+
+    # Работа с портфелем
+    ("showportfolio", "Показать портфель в USD", "showportfolio", "Требуется авторизация"),
+    ("showportfolio --base EUR", "Портфель в EUR", "showportfolio --base EUR", "Неизвестная базовая валюта"),
+    ("buy", "Купить валюту", "buy --currency BTC --amount 0.05", "Недостаточно средств, неизвестная валюта, неверная сумма"),
+    ("sell", "Продать валюту", "sell --currency BTC --amount 0.01", "Недостаточно средств, валюта не найдена, неверная сумма"),
+
+    # Курсы валют (старые команды)
+    ("getrate", "Получить курс между валютами", "getrate --from USD --to BTC", "Валюта не найдена, ошибка API"),
+    ("list-currencies", "Список поддерживаемых валют", "list-currencies", "-"),
+
+    # Курсы валют (новые команды)
+    ("update-rates", "Обновить все курсы", "update-rates", "Ошибка API"),
+    ("update-rates --source coingecko", "Обновить только криптовалюты", "update-rates --source coingecko", "Неизвестный источник"),
+    ("update-rates --source exchangerate", "Обновить только фиатные валюты", "update-rates --source exchangerate", "Неизвестный источник"),
+    ("show-rates", "Показать все курсы из кеша", "show-rates", "Кеш пуст"),
+    ("show-rates --currency BTC", "Курс конкретной валюты", "show-rates --currency BTC", "Валюта не найдена в кеше"),
+    ("show-rates --top 3", "Топ-3 криптовалют", "show-rates --top 3", "Нет криптовалют в кеше"),
+    ("show-rates --base EUR", "Курсы в EUR", "show-rates --base EUR", "Нет курса для базовой валюты"),
+
+    # Parser Service
+    ("update-all", "Обновить все курсы (старая команда)", "update-all", "-"),
+    ("parser-test", "Тест Parser Service", "parser-test", "-"),
+    ("parser-status", "Статус Parser Service", "parser-status", "-"),
+    ("exchange-stats", "Статистика исторических данных", "exchange-stats", "-"),
+    ("view-history", "История курса валюты", "view-history --currency BTC --limit 5", "-"),
+    ("cleanup-history", "Очистка старых записей", "cleanup-history --days 30", "-"),
+
+    # Логи и отладка
+    ("view-logs", "Просмотр логов", "view-logs --lines 10", "Файл логов не найден"),
+
+    # Выход
+    ("exit/quit", "Выход из приложения", "exit", "-"),
+    ("help", "Показать эту справку", "help", "-"),
+)
 
 
 class TradingCLI(cmd.Cmd):
@@ -22,87 +331,333 @@ class TradingCLI(cmd.Cmd):
     intro = "Добро пожаловать в ValutaTrade Hub! Введите 'help' для списка команд\n"
     prompt = "> "
 
+    # Общая справка статична: рендерится один раз и переиспользуется
+    _HELP_CACHE: Optional[str] = None
+
+    # Таблица команд: имя команды -> функция do_* (заполняется после объявления класса)
+    _COMMANDS: Dict[str, Callable] = {}
+
+    # Справка по командам: имя команды -> docstring (строится при первом 'help <команда>')
+    _COMMAND_DOCS: Optional[Dict[str, str]] = None
+
+    # Команды с дефисом -> имя метода do_* (EOF: Ctrl+D / конец ввода)
+    _ALIASES = {
+        'show-portfolio': 'showportfolio',
+        'get-rate': 'getrate',
+        'update-rates': 'updaterates',
+        'show-rates': 'showrates',
+        'list-currencies': 'listcurrencies',
+        'view-logs': 'viewlogs',
+        'parser-test': 'parser_test',
+        'update-all': 'update_all',
+        'parser-status': 'parser_status',
+        'exchange-stats': 'exchangestats',
+        'view-history': 'viewhistory',
+        'cleanup-history': 'cleanuphistory',
+        'EOF': 'exit',
+    }
+
     def __init__(self):
         super().__init__()
-        self.user_manager = UserManager()
-        self.portfolio_manager = PortfolioManager(self.user_manager)
-        self.rate_manager = RateManager()
+
+        # Менеджеры создаются при первом обращении (см. свойства ниже)
+        self._user_manager = None
+        self._portfolio_manager = None
+        self._rate_manager = None
+
+        # Парсеры аргументов строятся один раз и переиспользуются между вызовами
+        self._parsers = {
+            'register': _build_parser('register', '--username', '--password'),
+            'login': _build_parser('login', '--username', '--password'),
+            'showportfolio': _build_parser('showportfolio', '--base'),
+            'buy': _build_parser('buy', '--currency', '--amount'),
+            'sell': _build_parser('sell', '--currency', '--amount'),
+            'getrate': _build_parser('getrate', '--from', '--to'),
+            'update-rates': _build_parser('update-rates', '--source'),
+            'show-rates': _build_parser('show-rates', '--currency', '--top', '--base'),
+            'view-history': _build_parser('view-history', '--currency', '--limit'),
+            'cleanup-history': _build_parser('cleanup-history', '--days'),
+            'view-logs': _build_parser('view-logs', '--lines'),
+        }
+
+        # Сервис курсов, RatesUpdater и хранилище истории создаются при первом обращении
+        self._currency_service = None
+        self._rates_updater = None
+        self._history_storage = None
+
+        # Кеш getrate: (from, to) -> (курс, время обновления для вывода, момент устаревания)
+        from ..infra.settings import settings
+
+        self._rate_cache: Dict[Tuple[str, str], Tuple[float, str, float]] = {}
+        self._rate_cache_ttl = float(settings.get("api.cli_rate_cache_seconds", _RATE_CACHE_TTL))
+
+        # Результат последнего обновления курсов: (момент обновления, результат run_update)
+        self._last_update: Optional[Tuple[float, Dict]] = None
+        self._update_cache_ttl = float(settings.get("api.cli_update_cache_seconds", _UPDATE_CACHE_TTL))
+        # Одновременно выполняется не больше одного обновления (остальные ждут его результат)
+        self._update_lock = threading.Lock()
+
+        # Последний статус parser-status: (отпечаток файла истории и время обновления, статус)
+        self._status_cache: Optional[Tuple[Tuple, Dict]] = None
 
     # ===== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ =====
 
-    def _handle_exception(self, e: Exception) -> None:
-        """Обрабатывает исключения и выводит соответствующие сообщения."""
-        if isinstance(e, InsufficientFundsError):
-            print(f"❌ {str(e)}")
-            print("   Проверьте баланс кошелька и введите меньшую сумму.")
+    @property
+    def user_manager(self):
+        """Возвращает менеджер пользователей, создавая его при первом обращении."""
+        if self._user_manager is None:
+            from ..core.usecases import UserManager
+
+            self._user_manager = UserManager()
+        return self._user_manager
+
+    @property
+    def portfolio_manager(self):
+        """Возвращает менеджер портфелей, создавая его при первом обращении."""
+        if self._portfolio_manager is None:
+            from ..core.usecases import PortfolioManager
+
+            # Сделки берут курсы из общего RateManager сессии
+            self._portfolio_manager = PortfolioManager(self.user_manager, rate_manager=self.rate_manager)
+        return self._portfolio_manager
+
+    @property
+    def rate_manager(self):
+        """Возвращает менеджер курсов, создавая его при первом обращении."""
+        if self._rate_manager is None:
+            from ..core.usecases import RateManager
+
+            # Неявное обновление курсов идет через _run_update: общая блокировка, TTL и сброс статуса
+            self._rate_manager = RateManager(update_runner=self._run_update)
+        return self._rate_manager
+
+    @property
+    def currency_service(self):
+        """Возвращает общий для сессии экземпляр CurrencyService."""
+        if self._currency_service is None:
+            from ..core.utils import CurrencyService
+
+            self._currency_service = CurrencyService()
+        return self._currency_service
+
+    @property
+    def rates_updater(self):
+        """Возвращает общий для сессии RatesUpdater (клиенты API и хранилище создаются один раз)."""
+        if self._rates_updater is None:
+            from ..parser_service.updater import RatesUpdater
 
-        elif isinstance(e, CurrencyNotFoundError):
-            print(f"❌ {str(e)}")
-            print("   Для просмотра списка поддерживаемых валют используйте команду:")
-            print("   list-currencies")
+            self._rates_updater = RatesUpdater(storage=self.history_storage)
+        return self._rates_updater
 
-        elif isinstance(e, ApiRequestError):
-            print(f"❌ {str(e)}")
-            print("   Пожалуйста, повторите попытку позже.")
-            print("   Проверьте подключение к сети и доступность сервиса.")
+    @property
+    def history_storage(self):
+        """Возвращает общее для сессии хранилище исторических курсов (ExchangeRatesStorage)."""
+        if self._history_storage is None:
+            from ..parser_service.storage import ExchangeRatesStorage
 
-        elif isinstance(e, InvalidAmountError):
-            print(f"❌ {str(e)}")
-            print("   Введите положительное число больше нуля.")
+            self._history_storage = ExchangeRatesStorage()
+        return self._history_storage
 
-        elif isinstance(e, UserNotAuthenticatedError):
-            print(f"❌ {str(e)}")
-            print("   Используйте команду login для входа в систему.")
+    def _run_update(self, force: bool = False,
+                    preloaded_crypto_rates: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Обновляет курсы через RatesUpdater, не повторяя запросы к API чаще заданного интервала.
 
-        elif isinstance(e, ValutaTradeError):
-            print(f"❌ {str(e)}")
+        Если обновление уже выполняется, вызов дожидается его завершения
+        и возвращает тот же результат вместо повторного запроса. Любое выполненное
+        обновление запоминается в _last_update.
 
-        else:
-            print(f"❌ Непредвиденная ошибка: {type(e).__name__}: {str(e)}")
-            print("   Пожалуйста, сообщите об этом разработчику.")
+        Args:
+            force: Явное обновление (update-rates, parser-test): интервал и дисковый
+                кеш CoinGecko не используются, курсы запрашиваются заново.
+            preloaded_crypto_rates: Уже полученные курсы CoinGecko (см. RatesUpdater.run_update).
 
-    # ===== ОБЯЗАТЕЛЬНЫЕ КОМАНДЫ =====
+        Returns:
+            Dict: Результат RatesUpdater.run_update() (свежий или недавний).
+        """
+        with self._update_lock:
+            if not force and self._last_update is not None:
+                age = time.monotonic() - self._last_update[0]
+                if age < self._update_cache_ttl:
+                    print(f"ℹ️  Курсы обновлялись {age:.0f} с назад: используется результат последнего обновления")
+                    return self._last_update[1]
+
+            result = self.rates_updater.run_update(preloaded_crypto_rates, use_cache=not force)
+            self._last_update = (time.monotonic(), result)
+            return result
+
+    def _get_update_status(self) -> Dict:
+        """
+        Возвращает статус Parser Service, перечитывая его только после изменения данных.
 
-    def do_register(self, arg: str) -> None:
+        Статус зависит от файла истории и времени последнего обновления, поэтому
+        кешируется по отпечатку файла (mtime, размер, inode) и last_update_time:
+        любое обновление курсов или очистка истории меняют ключ.
+
+        Returns:
+            Dict: Результат RatesUpdater.get_update_status().
         """
-        Регистрация нового пользователя.
-        Использование: register --username <username> --password <password>
-        Пример: register --username alice --password 1234
+        updater = self.rates_updater
+        key = (updater.storage.history_fingerprint(), updater.last_update_time)
+        cached = self._status_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        status = updater.get_update_status()
+        self._status_cache = (key, status)
+        return status
+
+    def _parse_credentials(self, arg: str, command: str) -> Optional[Tuple[str, str]]:
         """
-        args = shlex.split(arg)
+        Разбирает аргументы --username/--password команд register и login.
 
+        Args:
+            arg: Строка аргументов команды.
+            command: Имя команды ('register' или 'login').
+
+        Returns:
+            Кортеж (username, password) или None, если аргументы некорректны
+            (сообщение об ошибке уже выведено).
+        """
         # Парсим аргументы
-        username = None
-        password = None
+        try:
+            ns = self._parsers[command].parse_args(_split(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR[command])
+            return None
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--username" and i + 1 < len(args):
-                username = args[i + 1]
-                i += 2
-            elif args[i] == "--password" and i + 1 < len(args):
-                password = args[i + 1]
-                i += 2
+        # Проверяем обязательные аргументы
+        if not ns.username or not ns.password:
+            self._emit(f"{_ERR} Ошибка: требуются оба аргумента --username и --password", _USAGE[command])
+            return None
+
+        return ns.username, ns.password
+
+    def _parse_trade(self, arg: str, command: str) -> Optional[Tuple[str, float]]:
+        """
+        Разбирает аргументы --currency/--amount команд buy и sell.
+
+        Args:
+            arg: Строка аргументов команды.
+            command: Имя команды ('buy' или 'sell').
+
+        Returns:
+            Кортеж (код валюты, сумма) или None, если аргументы некорректны
+            (сообщение об ошибке уже выведено).
+        """
+        # Коды валют и суммы не содержат кавычек и пробелов: shlex не нужен
+        try:
+            ns = self._parsers[command].parse_args(arg.split())
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR[command])
+            return None
+
+        currency_code = ns.currency
+        amount = None
+        if ns.amount is not None:
+            try:
+                amount = float(ns.amount)
+            except ValueError:
+                print(f"{_ERR} Ошибка: 'amount' должен быть положительным числом")
+                return None
+
+        # Проверяем обязательные аргументы
+        if not currency_code or amount is None:
+            self._emit(f"{_ERR} Ошибка: требуются оба аргумента --currency и --amount", _USAGE[command])
+            return None
+
+        return currency_code, amount
+
+    def _execute_trade(self, arg: str, command: str) -> None:
+        """
+        Выполняет команду buy или sell и выводит результат сделки.
+
+        Ошибки предметной области (ValutaTradeError и подклассы) выводятся
+        через _handle_exception с подсказкой по типу исключения.
+
+        Args:
+            arg: Строка аргументов команды.
+            command: Имя команды ('buy' или 'sell').
+        """
+        # Проверка авторизации
+        if not self.user_manager.is_logged_in:
+            print(f"{_ERR} Ошибка: требуется авторизация. Используйте команду login")
+            return
+
+        trade = self._parse_trade(arg, command)
+        if trade is None:
+            return
+        currency_code, amount = trade
+
+        try:
+            # Выполняем сделку (может выбросить различные исключения)
+            if command == 'buy':
+                success, message = self.portfolio_manager.buy_currency(currency_code, amount)
             else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: register --username <username> --password <password>")
-                print("Пример: register --username alice --password 1234")
+                success, message = self.portfolio_manager.sell_currency(currency_code, amount)
+
+            if success:
+                # Строки результата сделки приходят уже разделенными (TradeResult)
+                self._emit(
+                    f"{_OK} {message.headline}",
+                    *(f"{_OK} {detail}" for detail in message.details),
+                    "   📈 Операция записана в журнал действий",
+                )
+            else:
+                print(f"{_ERR} {message}")
+
+        except ValutaTradeError as e:
+            self._handle_exception(e)
+        except Exception as e:
+            print(f"{_ERR} Непредвиденная ошибка: {e}")
+
+    @staticmethod
+    def _emit(*lines: str) -> None:
+        """
+        Выводит строки ответа команды одной записью в stdout.
+
+        Args:
+            lines: Строки вывода (без завершающего перевода строки).
+        """
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+    def _handle_exception(self, e: Exception) -> None:
+        """Обрабатывает исключения и выводит соответствующие сообщения."""
+        # Ищем подсказку по иерархии класса исключения: одно обращение к словарю на уровень
+        for exc_type in type(e).__mro__:
+            if exc_type in _EXCEPTION_HINTS:
+                hint = _EXCEPTION_HINTS[exc_type]
+                lines = [f"{_ERR} {str(e)}"]
+                if hint:
+                    lines.append(hint)
+                self._emit(*lines)
                 return
 
-        # Проверяем обязательные аргументы
-        if not username or not password:
-            print("❌ Ошибка: требуются оба аргумента --username и --password")
-            print("Использование: register --username <username> --password <password>")
+        self._emit(
+            f"{_ERR} Непредвиденная ошибка: {type(e).__name__}: {str(e)}",
+            "   Пожалуйста, сообщите об этом разработчику.",
+        )
+
+    # ===== ОБЯЗАТЕЛЬНЫЕ КОМАНДЫ =====
+
+    def do_register(self, arg: str) -> None:
+        """
+        Регистрация нового пользователя.
+        Использование: register --username <username> --password <password>
+        Пример: register --username alice --password 1234
+        """
+        credentials = self._parse_credentials(arg, 'register')
+        if credentials is None:
             return
+        username, password = credentials
 
         # Выполняем регистрацию
         success, message = self.user_manager.register(username, password)
 
         if success:
-            print(f"✅ {message}")
-            print(f"   Войдите: login --username {username} --password ****")
+            self._emit(f"{_OK} {message}", f"   Войдите: login --username {username} --password ****")
         else:
-            print(f"❌ {message}")
+            print(f"{_ERR} {message}")
 
     def do_login(self, arg: str) -> None:
         """
@@ -110,40 +665,19 @@ class TradingCLI(cmd.Cmd):
         Использование: login --username <username> --password <password>
         Пример: login --username alice --password 1234
         """
-        args = shlex.split(arg)
-
-        # Парсим аргументы
-        username = None
-        password = None
-
-        i = 0
-        while i < len(args):
-            if args[i] == "--username" and i + 1 < len(args):
-                username = args[i + 1]
-                i += 2
-            elif args[i] == "--password" and i + 1 < len(args):
-                password = args[i + 1]
-                i += 2
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: login --username <username> --password <password>")
-                print("Пример: login --username alice --password 1234")
-                return
-
-        # Проверяем обязательные аргументы
-        if not username or not password:
-            print("❌ Ошибка: требуются оба аргумента --username и --password")
-            print("Использование: login --username <username> --password <password>")
+        credentials = self._parse_credentials(arg, 'login')
+        if credentials is None:
             return
+        username, password = credentials
 
         # Выполняем вход
         success, message = self.user_manager.login(username, password)
 
         if success:
-            print(f"✅ Вы вошли как '{username}'")
+            print(f"{_OK} Вы вошли как '{username}'")
             self.prompt = f"{username}> "
         else:
-            print(f"❌ {message}")
+            print(f"{_ERR} {message}")
 
     def do_showportfolio(self, arg: str) -> None:
         """
@@ -152,43 +686,35 @@ class TradingCLI(cmd.Cmd):
         Пример: showportfolio
         Пример: showportfolio --base EUR
         """
-        # Парсим аргументы
-        base_currency = 'USD'  # значение по умолчанию
-        args = shlex.split(arg)
+        # Проверка авторизации до разбора аргументов
+        if not self.user_manager.is_logged_in:
+            print(f"{_ERR} Сначала выполните login")
+            return
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--base" and i + 1 < len(args):
-                base_currency = args[i + 1].upper()
-                i += 2
-            else:
-                # Если есть аргументы, но не --base, это ошибка
-                if args:
-                    print("❌ Ошибка: неверный формат команды")
-                    print("Использование: showportfolio [--base <currency_code>]")
-                    print("Пример: showportfolio")
-                    print("Пример: showportfolio --base EUR")
-                    return
+        from ..core.utils import InputValidator
+
+        # Парсим аргументы
+        try:
+            ns = self._parsers['showportfolio'].parse_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['showportfolio'])
+            return
+        base_currency = ns.base or 'USD'  # значение по умолчанию
 
         # Проверяем, что валюта валидна
         if not InputValidator.validate_currency_code(base_currency):
-            print(f"❌ Ошибка: неизвестная базовая валюта '{base_currency}'")
+            print(f"{_ERR} Ошибка: неизвестная базовая валюта '{base_currency}'")
             return
 
         # Получаем данные портфеля
         success, message, portfolio_data = self.portfolio_manager.show_portfolio(base_currency)
 
         if not success:
-            print(f"❌ {message}")
+            print(f"{_ERR} {message}")
             return
 
         if not portfolio_data:
-            print("❌ Портфель не найден")
-            return
-
-        # Получаем информацию о текущем пользователе
-        if not self.user_manager.is_logged_in:
-            print("❌ Ошибка: сначала выполните login")
+            print(f"{_ERR} Портфель не найден")
             return
 
         username = self.user_manager.current_user.username
@@ -198,32 +724,41 @@ class TradingCLI(cmd.Cmd):
             print(f"Портфель пользователя '{username}' пуст")
             return
 
-        # Форматируем вывод
-        print(f"\n📊 Портфель пользователя '{username}' (база: {base_currency}):")
+        balances = portfolio_data["data"]
 
-        total_value = portfolio_data["total_value"]
-        service = CurrencyService()
+        # Курсы всех валют портфеля к базовой получаем одним запросом
+        try:
+            rates = self.currency_service.get_exchange_rates(
+                [code for code in balances if code != base_currency], base_currency
+            )
+        except ApiRequestError as e:
+            self._handle_exception(e)
+            return
 
-        for currency, balance in portfolio_data["data"].items():
-            # Получаем курс конвертации
-            if currency == base_currency:
-                converted = balance
-            else:
-                try:
-                    rate = service.get_exchange_rate(currency, base_currency)
-                    if not rate:
-                        print(f"❌ Ошибка: курс для {currency}/{base_currency} не найден")
-                        return
-                    converted = balance * rate
-                except ApiRequestError as e:
-                    self._handle_exception(e)
-                    return
+        # Форматируем вывод (строки собираются и выводятся одной записью)
+        lines = [f"\n📊 Портфель пользователя '{username}' (база: {base_currency}):"]
+
+        # Стоимости строк в базовой валюте: из них же считается итог
+        values = []
+
+        # Локальные ссылки вместо поиска глобального имени и атрибута на каждой итерации
+        row = _PORTFOLIO_ROW
+        append = lines.append
+        for currency, balance in balances.items():
+            # Курс конвертации (для базовой валюты — 1)
+            rate = 1.0 if currency == base_currency else rates.get(currency)
+            if not rate:
+                append(f"{_ERR} Ошибка: курс для {currency}/{base_currency} не найден")
+                self._emit(*lines)
+                return
 
-            # Форматируем вывод для каждой валюты
-            print(f"  - {currency}: {balance:,.4f}  → {converted:,.2f} {base_currency}")
+            value = balance * rate
+            values.append(value)
+            append(row(currency, balance, value, base_currency))
 
-        print(f"{'='*50}")
-        print(f"💎 ИТОГО: {total_value:,.2f} {base_currency}")
+        lines.append(_SEP)
+        lines.append(_PORTFOLIO_TOTAL(math.fsum(values), base_currency))
+        self._emit(*lines)
 
     def do_buy(self, arg: str) -> None:
         """
@@ -237,64 +772,7 @@ class TradingCLI(cmd.Cmd):
         - InvalidAmountError: "Сумма покупки должна быть положительной"
         - InsufficientFundsError: "Недостаточно средств: доступно X.XXXX {code}, требуется X.XXXX {code}"
         """
-        # Проверка авторизации
-        if not self.user_manager.is_logged_in:
-            print("❌ Ошибка: требуется авторизация. Используйте команду login")
-            return
-
-        args = shlex.split(arg)
-
-        # Парсим аргументы
-        currency_code = None
-        amount = None
-
-        i = 0
-        while i < len(args):
-            if args[i] == "--currency" and i + 1 < len(args):
-                currency_code = args[i + 1].upper()
-                i += 2
-            elif args[i] == "--amount" and i + 1 < len(args):
-                try:
-                    amount = float(args[i + 1])
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: 'amount' должен быть положительным числом")
-                    return
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: buy --currency <currency_code> --amount <amount>")
-                print("Пример: buy --currency BTC --amount 0.05")
-                return
-
-        # Проверяем обязательные аргументы
-        if not currency_code or amount is None:
-            print("❌ Ошибка: требуются оба аргумента --currency и --amount")
-            print("Использование: buy --currency <currency_code> --amount <amount>")
-            print("Пример: buy --currency BTC --amount 0.05")
-            return
-
-        try:
-            # Выполняем покупку (может выбросить различные исключения)
-            success, message = self.portfolio_manager.buy_currency(currency_code, amount)
-
-            if success:
-                # Разбираем обогащенное сообщение
-                lines = message.split(". ")
-                for line in lines:
-                    if "Покупка выполнена" in line or "Оценочная стоимость" in line:
-                        print(f"✅ {line}")
-                    else:
-                        print(f"   {line}")
-                # Дополнительная информация
-                print("   📈 Операция записана в журнал действий")
-            else:
-                print(f"❌ {message}")
-
-        except (CurrencyNotFoundError, ApiRequestError, InvalidAmountError,
-                InsufficientFundsError, UserNotAuthenticatedError) as e:
-            self._handle_exception(e)
-        except Exception as e:
-            print(f"❌ Непредвиденная ошибка: {e}")
+        self._execute_trade(arg, 'buy')
 
     def do_sell(self, arg: str) -> None:
         """
@@ -308,64 +786,7 @@ class TradingCLI(cmd.Cmd):
         - ApiRequestError: "Ошибка при обращении к внешнему API: {reason}"
         - InvalidAmountError: "Сумма продажи должна быть положительной"
         """
-        # Проверка авторизации
-        if not self.user_manager.is_logged_in:
-            print("❌ Ошибка: требуется авторизация. Используйте команду login")
-            return
-
-        args = shlex.split(arg)
-
-        # Парсим аргументы
-        currency_code = None
-        amount = None
-
-        i = 0
-        while i < len(args):
-            if args[i] == "--currency" and i + 1 < len(args):
-                currency_code = args[i + 1].upper()
-                i += 2
-            elif args[i] == "--amount" and i + 1 < len(args):
-                try:
-                    amount = float(args[i + 1])
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: 'amount' должен быть положительным числом")
-                    return
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: sell --currency <currency_code> --amount <amount>")
-                print("Пример: sell --currency BTC --amount 0.01")
-                return
-
-        # Проверяем обязательные аргументы
-        if not currency_code or amount is None:
-            print("❌ Ошибка: требуются оба аргумента --currency и --amount")
-            print("Использование: sell --currency <currency_code> --amount <amount>")
-            print("Пример: sell --currency BTC --amount 0.01")
-            return
-
-        try:
-            # Выполняем продажу (может выбросить различные исключения)
-            success, message = self.portfolio_manager.sell_currency(currency_code, amount)
-
-            if success:
-                # Разбираем обогащенное сообщение
-                lines = message.split(". ")
-                for line in lines:
-                    if "Продажа выполнена" in line or "Оценочная выручка" in line:
-                        print(f"✅ {line}")
-                    else:
-                        print(f"   {line}")
-                # Дополнительная информация
-                print("   📈 Операция записана в журнал действий")
-            else:
-                print(f"❌ {message}")
-
-        except (CurrencyNotFoundError, ApiRequestError, InvalidAmountError,
-                InsufficientFundsError, UserNotAuthenticatedError) as e:
-            self._handle_exception(e)
-        except Exception as e:
-            print(f"❌ Непредвиденная ошибка: {e}")
+        self._execute_trade(arg, 'sell')
 
     def do_getrate(self, arg: str) -> None:
         """
@@ -378,70 +799,75 @@ class TradingCLI(cmd.Cmd):
         - CurrencyNotFoundError: "Неизвестная валюта '{code}'" - точные сообщения
         - ApiRequestError: "Ошибка при обращении к внешнему API: {reason}" - точные сообщения
         """
-        # Парсим аргументы
-        from_currency = None
-        to_currency = None
+        # Пустая команда: сразу сообщаем об отсутствующих аргументах
+        if not arg.strip():
+            self._emit(f"{_ERR} Ошибка: требуются оба аргумента --from и --to", _USAGE['getrate'])
+            return
 
-        args = shlex.split(arg)
-        i = 0
-        while i < len(args):
-            if args[i] == "--from" and i + 1 < len(args):
-                from_currency = args[i + 1].upper()
-                i += 2
-            elif args[i] == "--to" and i + 1 < len(args):
-                to_currency = args[i + 1].upper()
-                i += 2
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: getrate --from <currency_code> --to <currency_code>")
-                print("Пример: getrate --from USD --to BTC")
-                print("Пример: getrate --from EUR --to USD")
-                return
+        # Парсим аргументы (коды валют не содержат кавычек и пробелов: shlex не нужен)
+        try:
+            ns = vars(self._parsers['getrate'].parse_args(arg.split()))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['getrate'])
+            return
+
+        from_currency = ns['from']
+        to_currency = ns['to']
 
         # Проверяем обязательные аргументы
         if not from_currency or not to_currency:
-            print("❌ Ошибка: требуются оба аргумента --from и --to")
-            print("Использование: getrate --from <currency_code> --to <currency_code>")
-            print("Пример: getrate --from USD --to BTC")
+            self._emit(f"{_ERR} Ошибка: требуются оба аргумента --from и --to", _USAGE['getrate'])
             return
 
+        # Повторный запрос той же пары в пределах TTL отвечаем из кеша
+        cache_key = (from_currency, to_currency)
+
         try:
-            # Получаем курс (может выбросить CurrencyNotFoundError или ApiRequestError)
-            success, message, rate, updated_at = self.rate_manager.get_rate(from_currency, to_currency)
+            cached = self._rate_cache.get(cache_key)
+            if cached is not None and cached[2] > time.monotonic():
+                success, rate, time_str = True, cached[0], cached[1]
+            else:
+                # Получаем курс (может выбросить CurrencyNotFoundError или ApiRequestError)
+                success, message, rate, updated_at = self.rate_manager.get_rate(from_currency, to_currency)
+
+                # Форматируем время обновления (в кеш попадает уже готовая строка)
+                time_str = _format_updated_at(updated_at) if updated_at else "неизвестно"
+
+                if success and rate is not None:
+                    self._rate_cache[cache_key] = (rate, time_str, time.monotonic() + self._rate_cache_ttl)
 
             if success and rate is not None:
-                # Форматируем время обновления
-                time_str = "неизвестно"
-                if updated_at:
-                    try:
-                        dt = datetime.fromisoformat(updated_at)
-                        time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-                    except (ValueError, TypeError):
-                        time_str = updated_at
-
-                print(f"✅ Курс {from_currency}→{to_currency}: {rate:.8f}")
-                print(f"   📅 Обновлено: {time_str}")
+                lines = [
+                    f"{_OK} Курс {from_currency}→{to_currency}: {rate:.8f}",
+                    f"   📅 Обновлено: {time_str}",
+                ]
 
                 # Показываем обратный курс если он не бесконечный
                 if rate != 0:
                     reverse_rate = 1 / rate
-                    # Форматируем в зависимости от величины
-                    if reverse_rate < 0.0001:
-                        print(f"   🔄 Обратный курс {to_currency}→{from_currency}: {reverse_rate:.8f}")
-                    else:
-                        print(f"   🔄 Обратный курс {to_currency}→{from_currency}: {reverse_rate:.6f}")
+                    # Для очень малых значений показываем больше знаков
+                    precision = 8 if reverse_rate < 0.0001 else 6
+                    lines.append(f"   🔄 Обратный курс {to_currency}→{from_currency}: {reverse_rate:.{precision}f}")
+
+                self._emit(*lines)
 
         except CurrencyNotFoundError as e:
-            print(f"❌ {str(e)}")
-            print("   Используйте команду 'list-currencies' для просмотра доступных валют")
-            print("   Проверьте правильность написания кода валюты (например, USD, EUR, BTC)")
+            self._emit(
+                f"{_ERR} {str(e)}",
+                "   Используйте команду 'list-currencies' для просмотра доступных валют",
+                "   Проверьте правильность написания кода валюты (например, USD, EUR, BTC)",
+            )
         except ApiRequestError as e:
-            print(f"❌ {str(e)}")
-            print("   Сервис курсов валют временно недоступен")
-            print("   Попробуйте снова через несколько минут")
-            print("   Используется кешированное значение (если доступно)")
+            # Устаревшая запись пары больше не нужна: следующий запрос пойдет в RateManager
+            self._rate_cache.pop(cache_key, None)
+            self._emit(
+                f"{_ERR} {str(e)}",
+                "   Сервис курсов валют временно недоступен",
+                "   Попробуйте снова через несколько минут",
+                "   Используется кешированное значение (если доступно)",
+            )
         except Exception as e:
-            print(f"❌ Непредвиденная ошибка: {e}")
+            print(f"{_ERR} Непредвиденная ошибка: {e}")
 
     # ===== НОВЫЕ КОМАНДЫ ДЛЯ УПРАВЛЕНИЯ PARSER SERVICE =====
 
@@ -452,97 +878,88 @@ class TradingCLI(cmd.Cmd):
         Пример: update-rates
         Пример: update-rates --source coingecko
         """
-        # Парсим аргументы
-        args = shlex.split(arg)
-        source = None  # По умолчанию - все источники
+        # Парсим аргументы (прочие флаги игнорируются, позиционные аргументы — ошибка формата)
+        try:
+            ns, extra = self._parsers['update-rates'].parse_known_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['update-rates'])
+            return
+        if any(not token.startswith("--") for token in extra):
+            print(_FORMAT_ERROR['update-rates'])
+            return
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--source" and i + 1 < len(args):
-                source = args[i + 1].lower()
-                if source not in ["coingecko", "exchangerate"]:
-                    print(f"❌ Ошибка: неизвестный источник '{source}'. Используйте 'coingecko' или 'exchangerate'")
-                    return
-                i += 2
-            elif args[i] and not args[i].startswith("--"):
-                # Есть аргумент, но не флаг --source
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: update-rates [--source <coingecko|exchangerate>]")
-                print("Пример: update-rates")
-                print("Пример: update-rates --source coingecko")
+        source = None  # По умолчанию - все источники
+        if ns.source is not None:
+            source = ns.source.lower()
+            if source not in ["coingecko", "exchangerate"]:
+                print(f"{_ERR} Ошибка: неизвестный источник '{source}'. Используйте 'coingecko' или 'exchangerate'")
                 return
-            else:
-                i += 1
 
         print("🔄 Начало обновления курсов...")
+        self._rate_cache.clear()
 
         try:
-            # Инициализируем RatesUpdater
-            from ..parser_service.updater import RatesUpdater
-            updater = RatesUpdater()
-
             if source == "coingecko":
                 print("📈 Обновление данных только от CoinGecko...")
                 # Для обновления только от одного источника нужно модифицировать логику
                 # Временно используем стандартный run_update и фильтруем логи
-                result = updater.run_update()
+                result = self._run_update(force=True)
                 # Фильтруем результат для отображения только криптовалют
                 crypto_pairs = {k: v for k, v in result.get("pairs", {}).items()
-                              if k.split('_')[0] in ["BTC", "ETH", "LTC", "XRP", "ADA", "SOL", "DOT"]}
+                                if k.partition('_')[0] in _CRYPTO}
                 updated_count = len(crypto_pairs)
-                print(f"✅ CoinGecko: OK ({updated_count} курсов)")
+                print(f"{_OK} CoinGecko: OK ({updated_count} курсов)")
 
             elif source == "exchangerate":
                 print("💵 Обновление данных только от ExchangeRate-API...")
-                result = updater.run_update()
+                result = self._run_update(force=True)
                 # Фильтруем результат для отображения только фиатных валют
-                fiat_currencies = ["EUR", "GBP", "RUB", "JPY", "CHF"]
                 fiat_pairs = {k: v for k, v in result.get("pairs", {}).items()
-                             if k.split('_')[0] in fiat_currencies}
+                              if k.partition('_')[0] in _FIAT}
                 updated_count = len(fiat_pairs)
-                print(f"✅ ExchangeRate-API: OK ({updated_count} курсов)")
+                print(f"{_OK} ExchangeRate-API: OK ({updated_count} курсов)")
 
             else:
                 # Обновляем все источники
                 print("📈 Запрос к CoinGecko...")
                 print("💵 Запрос к ExchangeRate-API...")
-                result = updater.run_update()
+                result = self._run_update(force=True)
 
                 # Считаем количество курсов по типам
                 pairs = result.get("pairs", {})
-                crypto_count = len([p for p in pairs.keys()
-                                  if p.split('_')[0] in ["BTC", "ETH", "LTC", "XRP", "ADA", "SOL", "DOT"]])
-                fiat_count = len([p for p in pairs.keys()
-                                if p.split('_')[0] in ["EUR", "GBP", "RUB", "JPY", "CHF"]])
+                crypto_count = 0
+                fiat_count = 0
+                for p in pairs:
+                    code = p.partition('_')[0]
+                    if code in _CRYPTO:
+                        crypto_count += 1
+                    elif code in _FIAT:
+                        fiat_count += 1
 
                 if crypto_count > 0:
-                    print(f"✅ CoinGecko: OK ({crypto_count} курсов)")
+                    print(f"{_OK} CoinGecko: OK ({crypto_count} курсов)")
                 if fiat_count > 0:
-                    print(f"✅ ExchangeRate-API: OK ({fiat_count} курсов)")
+                    print(f"{_OK} ExchangeRate-API: OK ({fiat_count} курсов)")
 
                 updated_count = len(pairs)
 
-            # Выводим информацию о последнем обновлении
-            last_refresh = result.get("last_refresh", "неизвестно")
-            try:
-                dt = datetime.fromisoformat(last_refresh.replace('Z', '+00:00'))
-                time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except (ValueError, TypeError):
-                time_str = last_refresh
-
-            print(f"💾 Запись {updated_count} курсов в data/rates.json...")
-            print(f"✅ Обновление успешно. Всего обновлено курсов: {updated_count}. Последнее обновление: {time_str}")
-
-            # Принудительно перезагружаем кеш в RateManager
+            # Принудительно перезагружаем кеш в RateManager (он же форматирует время обновления)
             self.rate_manager.reload_rates_cache()
-            print("🔄 Кеш RateManager перезагружен")
+            time_str = self.rate_manager.get_last_refresh_display()
+
+            self._emit(
+                f"💾 Запись {updated_count} курсов в data/rates.json...",
+                f"{_OK} Обновление успешно. Всего обновлено курсов: {updated_count}. Последнее обновление: {time_str}",
+                "🔄 Кеш RateManager перезагружен",
+            )
 
         except ApiRequestError as e:
-            print(f"❌ Ошибка при обращении к API: {str(e)}")
-            print("ℹ️  Обновление завершено с ошибками. Проверьте logs/parser_service.log для подробностей.")
+            self._emit(
+                f"{_ERR} Ошибка при обращении к API: {str(e)}",
+                "ℹ️  Обновление завершено с ошибками. Проверьте logs/parser_service.log для подробностей.",
+            )
         except Exception as e:
-            print(f"❌ Неизвестная ошибка: {e}")
-            print("ℹ️  Проверьте логи для подробностей.")
+            self._emit(f"{_ERR} Неизвестная ошибка: {e}", "ℹ️  Проверьте логи для подробностей.")
 
     def do_showrates(self, arg: str) -> None:
         """
@@ -553,178 +970,98 @@ class TradingCLI(cmd.Cmd):
         Пример: show-rates --top 2
         Пример: show-rates --base EUR
         """
-        # Парсим аргументы
-        args = shlex.split(arg)
-        currency_filter = None
-        top_n = None
-        base_currency = 'USD'  # По умолчанию
+        # Парсим аргументы (лишние позиционные аргументы игнорируются)
+        try:
+            ns, extra = self._parsers['show-rates'].parse_known_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['show-rates'])
+            return
+        for token in extra:
+            if token.startswith("--"):
+                self._emit(f"{_ERR} Ошибка: неизвестный флаг '{token}'", _USAGE['show-rates'])
+                return
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--currency" and i + 1 < len(args):
-                currency_filter = args[i + 1].upper()
-                i += 2
-            elif args[i] == "--top" and i + 1 < len(args):
-                try:
-                    top_n = int(args[i + 1])
-                    if top_n <= 0:
-                        print("❌ Ошибка: значение --top должно быть положительным числом")
-                        return
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: --top должен быть числом")
-                    return
-            elif args[i] == "--base" and i + 1 < len(args):
-                base_currency = args[i + 1].upper()
-                i += 2
-            elif args[i].startswith("--"):
-                print(f"❌ Ошибка: неизвестный флаг '{args[i]}'")
-                print("Использование: show-rates [--currency <code>] [--top <N>] [--base <currency>]")
+        currency_filter = ns.currency
+        base_currency = ns.base or 'USD'  # По умолчанию
+        top_n = None
+        if ns.top is not None:
+            try:
+                top_n = int(ns.top)
+            except ValueError:
+                print(f"{_ERR} Ошибка: --top должен быть числом")
+                return
+            if top_n <= 0:
+                print(f"{_ERR} Ошибка: значение --top должно быть положительным числом")
                 return
-            else:
-                i += 1
 
         try:
-            # Получаем данные из кеша RateManager
-            rates_data = self.rate_manager.get_all_rates()
+            # Курсы, уже пересчитанные к базовой валюте и разделенные на крипто/фиат
+            view = self.rate_manager.get_rates_view(base_currency, _CRYPTO)
 
             # Проверяем, есть ли данные
-            if not rates_data or "pairs" not in rates_data or not rates_data["pairs"]:
-                print("❌ Локальный кеш курсов пуст.")
-                print("ℹ️  Выполните 'update-rates', чтобы загрузить данные.")
+            if not view["pairs_count"]:
+                self._emit(f"{_ERR} Локальный кеш курсов пуст.",
+                           "ℹ️  Выполните 'update-rates', чтобы загрузить данные.")
                 return
 
-            pairs = rates_data["pairs"]
-            last_refresh = rates_data.get("last_refresh", "неизвестно")
-
-            # Форматируем время обновления
-            try:
-                dt = datetime.fromisoformat(last_refresh.replace('Z', '+00:00'))
-                time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except (ValueError, TypeError):
-                time_str = last_refresh
+            time_str = self.rate_manager.get_last_refresh_display()
 
-            print(f"📊 Курсы из кеша (обновлено: {time_str}):")
+            # Строки вывода собираются в список и печатаются одной записью
+            out = [f"📊 Курсы из кеша (обновлено: {time_str}):"]
 
-            # Фильтруем пары по базовой валюте
             if base_currency != 'USD':
-                # Нужно конвертировать курсы к новой базовой валюте
-                # Для простоты показываем только USD пары и конвертируем
-                print(f"⚠️  Отображение курсов к базовой валюте {base_currency} (через USD)...")
-
-                # Находим курс базовой валюты к USD
-                base_to_usd_key = f"{base_currency}_USD"
-                if base_to_usd_key in pairs:
-                    base_rate = pairs[base_to_usd_key]["rate"]
-                    print(f"   Курс {base_currency} к USD: {base_rate}")
-                    print()
-
-                # Создаем список для сортировки
-                rate_list = []
-                for pair_key, pair_data in pairs.items():
-                    currency = pair_key.split('_')[0]
-                    to_currency = pair_key.split('_')[1]
-
-                    # Пропускаем пары, где целевая валюта не USD
-                    if to_currency != "USD":
-                        continue
-
-                    # Пропускаем саму базовую валюту
-                    if currency == base_currency:
-                        continue
-
-                    # Конвертируем курс к новой базовой валюте
-                    if currency != "USD":
-                        rate = pair_data["rate"]
-                        if base_currency == "USD":
-                            converted_rate = rate
-                        else:
-                            # Конвертируем через USD
-                            converted_rate = rate / base_rate if base_rate != 0 else 0
-
-                        rate_list.append((currency, converted_rate, pair_data.get("updated_at", "неизвестно")))
-            else:
-                # Используем USD как базовую валюту (по умолчанию)
-                rate_list = []
-                for pair_key, pair_data in pairs.items():
-                    parts = pair_key.split('_')
-                    if len(parts) == 2:
-                        currency, to_currency = parts
-                        if to_currency == "USD" and currency != "USD":
-                            rate_list.append((currency, pair_data["rate"],
-                                            pair_data.get("updated_at", "неизвестно")))
+                out.append(f"⚠️  Отображение курсов к базовой валюте {base_currency} (через USD)...")
+                if view["base_rate"] is None:
+                    self._emit(*out, f"{_ERR} Нет курса для базовой валюты '{base_currency}' в кеше.")
+                    return
+                out.append(f"   Курс {base_currency} к USD: {view['base_rate']}")
+                out.append("")
+
+            crypto_rates = view["crypto"]
+            fiat_rates = view["fiat"]
 
             # Применяем фильтр по валюте
             if currency_filter:
-                filtered_rates = [(c, r, t) for c, r, t in rate_list if c == currency_filter]
-                if not filtered_rates:
-                    print(f"❌ Курс для '{currency_filter}' не найден в кеше.")
-                    print("ℹ️  Проверьте правильность кода валюты или выполните 'update-rates'")
+                crypto_rates = [entry for entry in crypto_rates if entry[0] == currency_filter]
+                fiat_rates = [entry for entry in fiat_rates if entry[0] == currency_filter]
+                if not (crypto_rates or fiat_rates):
+                    self._emit(*out,
+                               f"{_ERR} Курс для '{currency_filter}' не найден в кеше.",
+                               "ℹ️  Проверьте правильность кода валюты или выполните 'update-rates'")
                     return
-                rate_list = filtered_rates
-
-            # Сортируем по курсу (по убыванию для криптовалют)
-            # Разделяем крипто и фиат для правильной сортировки
-            crypto_currencies = ["BTC", "ETH", "LTC", "XRP", "ADA", "SOL", "DOT"]
-
-            crypto_rates = [(c, r, t) for c, r, t in rate_list if c in crypto_currencies]
-            fiat_rates = [(c, r, t) for c, r, t in rate_list if c not in crypto_currencies]
-
-            # Сортируем криптовалюты по курсу (убывание)
-            crypto_rates.sort(key=lambda x: x[1], reverse=True)
-
-            # Сортируем фиатные валюты по алфавиту
-            fiat_rates.sort(key=lambda x: x[0])
-
-            # Объединяем списки
-            sorted_rates = crypto_rates + fiat_rates
 
             # Применяем фильтр --top
             if top_n:
                 # Берем только криптовалюты для --top
                 top_crypto = crypto_rates[:top_n]
                 if top_crypto:
-                    print(f"📈 Топ-{top_n} самых дорогих криптовалют:")
-                    for currency, rate, _updated_at in top_crypto:
-                        pair_key = f"{currency}_{base_currency}"
-                        print(f"  • {pair_key}: {rate:,.2f}")
+                    out.append(f"📈 Топ-{top_n} самых дорогих криптовалют:")
+                    for currency, rate, _display_time in top_crypto:
+                        out.append(f"  • {currency}_{base_currency}: {rate:,.2f}")
                 else:
-                    print(f"ℹ️  Нет криптовалют для отображения топ-{top_n}")
+                    out.append(f"ℹ️  Нет криптовалют для отображения топ-{top_n}")
+                self._emit(*out)
                 return
 
             # Выводим все курсы
             if crypto_rates:
-                print("📈 Криптовалюты:")
-                for currency, rate, updated_at in crypto_rates:
-                    pair_key = f"{currency}_{base_currency}"
-                    # Форматируем время обновления
-                    try:
-                        if 'T' in updated_at:
-                            time_part = updated_at.split('T')[1][:8]
-                            display_time = time_part
-                        else:
-                            display_time = updated_at[:8]
-                    except (IndexError, AttributeError):
-                        display_time = updated_at
-
-                    print(f"  • {pair_key}: {rate:,.2f} (обновлено: {display_time})")
+                out.append("📈 Криптовалюты:")
+                # Время обновления уже выделено в get_rates_view
+                for currency, rate, display_time in crypto_rates:
+                    out.append(f"  • {currency}_{base_currency}: {rate:,.2f} (обновлено: {display_time})")
 
             if fiat_rates:
-                print("\n💵 Фиатные валюты:")
-                for currency, rate, _updated_at in fiat_rates:
-                    pair_key = f"{currency}_{base_currency}"
+                out.append("\n💵 Фиатные валюты:")
+                for currency, rate, _display_time in fiat_rates:
                     # Для фиатных валют с малыми курсами показываем больше знаков
-                    if rate < 0.1:
-                        rate_str = f"{rate:.6f}"
-                    else:
-                        rate_str = f"{rate:.4f}"
+                    rate_str = f"{rate:.6f}" if rate < 0.1 else f"{rate:.4f}"
+                    out.append(f"  • {currency}_{base_currency}: {rate_str}")
 
-                    print(f"  • {pair_key}: {rate_str}")
-
-            print(f"\n📊 Всего курсов: {len(sorted_rates)}")
+            out.append(f"\n📊 Всего курсов: {len(crypto_rates) + len(fiat_rates)}")
+            self._emit(*out)
 
         except Exception as e:
-            print(f"❌ Ошибка при получении курсов: {e}")
+            print(f"{_ERR} Ошибка при получении курсов: {e}")
 
     # ===== КОМАНДЫ ДЛЯ ТЕСТИРОВАНИЯ PARSER SERVICE =====
 
@@ -735,37 +1072,42 @@ class TradingCLI(cmd.Cmd):
         """
         print("🔧 Тестирование Parser Service...")
         try:
-            # Импортируем компоненты Parser Service
-            from ..parser_service.api_clients import CoinGeckoClient
-            from ..parser_service.updater import RatesUpdater
+            updater = self.rates_updater
 
             print("1. Тестирование CoinGeckoClient...")
-            client = CoinGeckoClient()
-
             try:
-                rates = client.get_crypto_rates()
-                print(f"✅ Получено {len(rates)} курсов криптовалют:")
-                for currency, info in rates.items():
-                    print(f"   • {currency}: ${info['rate']:.2f} (источник: {info['source']})")
+                # Один живой запрос к CoinGecko: полученные курсы передаются в RatesUpdater
+                rates = updater.crypto_client.fetch_rates(use_cache=False)
+                lines = [f"{_OK} Получено {len(rates)} курсов криптовалют:"]
+                lines.extend(
+                    f"   • {pair_key.partition('_')[0]}: ${rate:.2f} (источник: CoinGecko)"
+                    for pair_key, rate in rates.items()
+                )
+                lines.append("\n2. Тестирование RatesUpdater...")
+                self._emit(*lines)
+
+                # Обновление идет через _run_update: оно учитывается как последнее
+                # и сбрасывает кеши статуса; getrate после него читает свежие курсы
+                self._rate_cache.clear()
+                all_rates = self._run_update(force=True, preloaded_crypto_rates=rates)
+                self.rate_manager.reload_rates_cache()
 
-                print("\n2. Тестирование RatesUpdater...")
-                updater = RatesUpdater()
-                all_rates = updater.update_all_rates()
-
-                print(f"✅ Обновление завершено. Всего валют: {len(all_rates)}")
                 # Показать статус
                 status = updater.get_update_status()
-                print("📊 Статус обновления:")
-                print(f"   • Последнее обновление: {status['last_update']}")
-                print(f"   • Всего валют: {status['total_currencies']}")
-                print(f"   • Источники: {', '.join(status['sources'])}")
+                self._emit(
+                    f"{_OK} Обновление завершено. Всего валют: {len(all_rates)}",
+                    "📊 Статус обновления:",
+                    f"   • Последнее обновление: {status['last_update']}",
+                    f"   • Всего валют: {status['latest_currencies']}",
+                    f"   • Источники: {', '.join(status['sources'])}",
+                )
 
             except Exception as e:
-                print(f"❌ Ошибка при тестировании: {e}")
+                print(f"{_ERR} Ошибка при тестировании: {e}")
                 print("   Проверьте подключение к интернету и доступность CoinGecko API")
 
         except ImportError as e:
-            print(f"❌ Ошибка импорта Parser Service: {e}")
+            print(f"{_ERR} Ошибка импорта Parser Service: {e}")
             print("   Убедитесь, что файлы Parser Service созданы в valutatrade_hub/parser_service/")
 
     def do_update_all(self, _: str) -> None:
@@ -774,94 +1116,72 @@ class TradingCLI(cmd.Cmd):
         Команда: update-all
         """
         print("🔄 Обновление всех курсов через Parser Service...")
+        self._rate_cache.clear()
         try:
-            from ..parser_service.updater import RatesUpdater
+            result = self._run_update()
 
-            updater = RatesUpdater()
-            # ИСПРАВЛЕНИЕ: используем новый метод run_update() вместо update_all_rates()
-            result = updater.run_update()
-
-            print("✅ Обновление завершено!")
-            print(f"   • Обновлено пар курсов: {len(result.get('pairs', {}))}")
-
-            # Фильтруем криптовалюты и фиатные
-            pairs = result.get('pairs', {})
-            crypto_currencies = []
-            fiat_currencies = []
-
-            for pair_key in pairs.keys():
-                currency = pair_key.split('_')[0]
-                if currency in ['BTC', 'ETH', 'LTC', 'XRP', 'ADA', 'SOL', 'DOT']:
-                    crypto_currencies.append(currency)
-                elif currency not in ['USD']:
-                    fiat_currencies.append(currency)
-
-            print(f"   • Криптовалюты: {sorted(set(crypto_currencies))}")
-            print(f"   • Фиатные валюты: {sorted(set(fiat_currencies))}")
+            # Разделяем валюты на криптовалюты и фиатные операциями над множествами
+            currencies = {pair_key.partition('_')[0] for pair_key in result.get('pairs', {})}
+            currencies.discard('USD')
 
             # Принудительно перезагружаем кеш в RateManager
             self.rate_manager.reload_rates_cache()
-            print("   • Кеш RateManager перезагружен")
 
-            print("\n💡 Теперь используйте команды:")
-            print("   • getrate --from BTC --to USD  (проверить обновленный курс)")
-            print("   • showportfolio                (если есть портфель)")
+            self._emit(
+                f"{_OK} Обновление завершено!",
+                f"   • Обновлено пар курсов: {len(result.get('pairs', {}))}",
+                f"   • Криптовалюты: {sorted(currencies & _CRYPTO)}",
+                f"   • Фиатные валюты: {sorted(currencies - _CRYPTO)}",
+                "   • Кеш RateManager перезагружен",
+                "\n💡 Теперь используйте команды:",
+                "   • getrate --from BTC --to USD  (проверить обновленный курс)",
+                "   • showportfolio                (если есть портфель)",
+            )
 
         except Exception as e:
-            print(f"❌ Ошибка при обновлении: {e}")
+            print(f"{_ERR} Ошибка при обновлении: {e}")
 
     def do_parser_status(self, _: str) -> None:
         """
         Показать статус Parser Service.
         Команда: parser-status
         """
-        print("📊 Статус Parser Service:")
+        lines = ["📊 Статус Parser Service:"]
         try:
-            from ..parser_service.updater import RatesUpdater
+            status = self._get_update_status()
 
-            updater = RatesUpdater()
-            status = updater.get_update_status()
-
-            print(f"   • Последнее обновление: {status['last_update'] or 'никогда'}")
-            print(f"   • Всего валют в кеше: {status['latest_currencies']}")
+            lines.append(f"   • Последнее обновление: {status['last_update'] or 'никогда'}")
+            lines.append(f"   • Всего валют в кеше: {status['latest_currencies']}")
             # Показываем первые 10 валют
             currencies = status['currencies']
             if currencies:
                 display = ', '.join(currencies[:10])
                 if len(currencies) > 10:
                     display += f'... (еще {len(currencies) - 10})'
-                print(f"   • Доступные валюты: {display}")
+                lines.append(f"   • Доступные валюты: {display}")
             else:
-                print("   • Доступные валюты: нет данных")
-            print(f"   • Источники данных: {', '.join(status['sources'])}")
-            print(f"   • Всего исторических записей: {status['total_records']}")
-            print(f"   • Формат данных: {status['formats']['exchange_rates']}")
+                lines.append("   • Доступные валюты: нет данных")
+            lines.append(f"   • Источники данных: {', '.join(status['sources'])}")
+            lines.append(f"   • Всего исторических записей: {status['total_records']}")
+            lines.append(f"   • Формат данных: {status['formats']['exchange_rates']}")
             # Проверить файлы
-            import os
-            print("\n📁 Файлы данных:")
-            print(f"   • data/rates.json: {'✅ существует' if os.path.exists('data/rates.json') else '❌ отсутствует'}")
-            print(f"   • data/exchange_rates.json: {'✅ существует' if os.path.exists('data/exchange_rates.json') else '❌ отсутствует'}")
-            # Показать информацию о файлах
-            if os.path.exists('data/exchange_rates.json'):
-                import json
-
-                try:
-                    with open('data/exchange_rates.json', 'r', encoding='utf-8') as f:
-                        rates_data = json.load(f)
-
-                    if isinstance(rates_data, dict):
-                        print("   • Формат: новый (с уникальными ID)")
-                        print(f"   • Всего записей: {len(rates_data)}")
-                        # Показать пример записи
-                        if rates_data:
-                            first_key = next(iter(rates_data))
-                            print(f"   • Пример ID записи: {first_key[:50]}...")
-
-                except Exception as e:
-                    print(f"   • Ошибка чтения файла: {e}")
+            lines.append("\n📁 Файлы данных:")
+            lines.append(f"   • data/rates.json: {f'{_OK} существует' if os.path.exists('data/rates.json') else f'{_ERR} отсутствует'}")
+            history_exists = os.path.exists('data/exchange_rates.json')
+            lines.append(f"   • data/exchange_rates.json: {f'{_OK} существует' if history_exists else f'{_ERR} отсутствует'}")
+            # Показать информацию о файлах (история уже прочитана в get_update_status)
+            if history_exists:
+                lines.append("   • Формат: новый (с уникальными ID)")
+                lines.append(f"   • Всего записей: {status['total_records']}")
+                # Показать пример записи
+                first_key = status['first_record_id']
+                if first_key:
+                    lines.append(f"   • Пример ID записи: {first_key[:50]}...")
 
         except Exception as e:
-            print(f"❌ Ошибка при получении статуса: {e}")
+            lines.append(f"{_ERR} Ошибка при получении статуса: {e}")
+
+        self._emit(*lines)
 
     def do_exit(self, _: str) -> None:
         """Выйти из приложения: exit"""
@@ -879,32 +1199,31 @@ class TradingCLI(cmd.Cmd):
         Показать статистику по историческим данных в новом формате.
         Команда: exchange-stats
         """
-        print("📊 Статистика исторических данных (новый формат):")
+        lines = ["📊 Статистика исторических данных (новый формат):"]
         try:
-            from ..parser_service.updater import RatesUpdater
-
-            updater = RatesUpdater()
+            updater = self.rates_updater
             stats = updater.get_historical_stats()
 
             if "message" in stats:
-                print(f"   ℹ️ {stats['message']}")
-                return
-
-            print(f"   • Всего записей: {stats['total_records']}")
-            print(f"   • Уникальных валют: {stats['unique_currencies']}")
-
-            if stats.get('currency_stats'):
-                print("\n   📈 Статистика по валютам:")
-                for currency, currency_stats in stats['currency_stats'].items():
-                    print(f"      {currency}:")
-                    print(f"        • Записей: {currency_stats['record_count']}")
-                    print(f"        • Минимум: {currency_stats['min_rate']:.2f}")
-                    print(f"        • Максимум: {currency_stats['max_rate']:.2f}")
-                    print(f"        • Среднее: {currency_stats['avg_rate']:.2f}")
-                    print(f"        • Источники: {', '.join(currency_stats['sources'])}")
+                lines.append(f"   ℹ️ {stats['message']}")
+            else:
+                lines.append(f"   • Всего записей: {stats['total_records']}")
+                lines.append(f"   • Уникальных валют: {stats['unique_currencies']}")
+
+                if stats.get('currency_stats'):
+                    lines.append("\n   📈 Статистика по валютам:")
+                    for currency, currency_stats in stats['currency_stats'].items():
+                        lines.append(f"      {currency}:")
+                        lines.append(f"        • Записей: {currency_stats['record_count']}")
+                        lines.append(f"        • Минимум: {currency_stats['min_rate']:.2f}")
+                        lines.append(f"        • Максимум: {currency_stats['max_rate']:.2f}")
+                        lines.append(f"        • Среднее: {currency_stats['avg_rate']:.2f}")
+                        lines.append(f"        • Источники: {', '.join(currency_stats['sources'])}")
 
         except Exception as e:
-            print(f"❌ Ошибка при получении статистики: {e}")
+            lines.append(f"{_ERR} Ошибка при получении статистики: {e}")
+
+        self._emit(*lines)
 
     def do_viewhistory(self, arg: str) -> None:
         """
@@ -912,74 +1231,59 @@ class TradingCLI(cmd.Cmd):
         Использование: view-history --currency <code> [--limit N]
         Пример: view-history --currency BTC --limit 5
         """
-        args = shlex.split(arg)
-        currency = None
-        limit = 10
+        try:
+            ns = self._parsers['view-history'].parse_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['view-history'])
+            return
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--currency" and i + 1 < len(args):
-                currency = args[i + 1].upper()
-                i += 2
-            elif args[i] == "--limit" and i + 1 < len(args):
-                try:
-                    limit = int(args[i + 1])
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: limit должен быть числом")
-                    return
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: view-history --currency <code> [--limit N]")
-                print("Пример: view-history --currency BTC --limit 5")
+        currency = ns.currency
+        limit = 10
+        if ns.limit is not None:
+            try:
+                limit = int(ns.limit)
+            except ValueError:
+                print(f"{_ERR} Ошибка: limit должен быть числом")
+                return
+            if limit <= 0:
+                print(f"{_ERR} Ошибка: limit должен быть положительным числом")
                 return
 
         if not currency:
-            print("❌ Ошибка: требуется аргумент --currency")
+            print(f"{_ERR} Ошибка: требуется аргумент --currency")
             return
 
         print(f"📅 История курса {currency}→USD (последние {limit} записей):")
 
         try:
-            from ..parser_service.storage import ExchangeRatesStorage
-
-            storage = ExchangeRatesStorage()
-            history = storage.get_rate_history(currency, "USD", limit)
+            history = self.history_storage.get_rate_history(currency, "USD", limit)
 
             if not history:
                 print(f"   ℹ️ Нет исторических данных для {currency}")
                 return
 
-            table = PrettyTable()
-            table.field_names = ["Время", "Курс", "Источник", "ID"]
-            table.align["Время"] = "l"
-            table.align["Курс"] = "r"
-            table.align["Источник"] = "l"
-            table.align["ID"] = "l"
-
-            for record in history:
-                # Обрезаем ID для лучшего отображения
-                short_id = record['id'][:20] + "..." if len(record['id']) > 20 else record['id']
-                # Форматируем время
-                timestamp = record['timestamp']
-                if 'T' in timestamp:
-                    time_part = timestamp.split('T')[1].split('.')[0]
-                    date_part = timestamp.split('T')[0]
-                    display_time = f"{date_part} {time_part}"
-                else:
-                    display_time = timestamp
-                table.add_row([
-                    display_time,
-                    f"{record['rate']:.6f}" if record['rate'] < 1 else f"{record['rate']:.2f}",
-                    record['source'],
-                    short_id
-                ])
-
-            print(table)
+            if len(history) > _HISTORY_STREAM_THRESHOLD:
+                # Большая выборка: строки форматируются и выводятся по одной, таблица в памяти не строится
+                header = _HISTORY_LINE("Время", "Курс", "Источник", "ID")
+                sys.stdout.write(header + '-' * (len(header) - 1) + '\n')
+                sys.stdout.writelines(_HISTORY_LINE(*_history_row(record)) for record in history)
+            else:
+                from prettytable import PrettyTable
+
+                table = PrettyTable()
+                table.field_names = ["Время", "Курс", "Источник", "ID"]
+                table.align["Время"] = "l"
+                table.align["Курс"] = "r"
+                table.align["Источник"] = "l"
+                table.align["ID"] = "l"
+
+                table.add_rows([_history_row(record) for record in history])
+
+                print(table)
             print(f"   Всего записей: {len(history)}")
 
         except Exception as e:
-            print(f"❌ Ошибка при получении истории: {e}")
+            print(f"{_ERR} Ошибка при получении истории: {e}")
 
     def do_cleanuphistory(self, arg: str) -> None:
         """
@@ -987,36 +1291,29 @@ class TradingCLI(cmd.Cmd):
         Использование: cleanup-history [--days N]
         Пример: cleanup-history --days 30
         """
-        args = shlex.split(arg)
-        days = 30
+        try:
+            ns = self._parsers['cleanup-history'].parse_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['cleanup-history'])
+            return
 
-        i = 0
-        while i < len(args):
-            if args[i] == "--days" and i + 1 < len(args):
-                try:
-                    days = int(args[i + 1])
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: days должен быть числом")
-                    return
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: cleanup-history [--days N]")
-                print("Пример: cleanup-history --days 30")
+        days = 30
+        if ns.days is not None:
+            try:
+                days = int(ns.days)
+            except ValueError:
+                print(f"{_ERR} Ошибка: days должен быть числом")
                 return
 
         print(f"🧹 Очистка исторических данных старше {days} дней...")
 
         try:
-            from ..parser_service.storage import ExchangeRatesStorage
-
-            storage = ExchangeRatesStorage()
-            deleted_count = storage.cleanup_old_records(days)
+            deleted_count = self.history_storage.cleanup_old_records(days)
 
-            print(f"✅ Удалено {deleted_count} старых записей")
+            print(f"{_OK} Удалено {deleted_count} старых записей")
 
         except Exception as e:
-            print(f"❌ Ошибка при очистке истории: {e}")
+            print(f"{_ERR} Ошибка при очистке истории: {e}")
 
     # ===== Вспомогательные команды =====
 
@@ -1025,22 +1322,24 @@ class TradingCLI(cmd.Cmd):
         if self.user_manager.is_logged_in:
             user = self.user_manager.current_user
             user_info = user.get_user_info()
-            print("👤 Текущий пользователь:")
-            print(f"   ID: {user_info['user_id']}")
-            print(f"   Имя: {user_info['username']}")
-            print(f"   Дата регистрации: {user_info['registration_date']}")
-            print("   Статус: активен")
+            self._emit(
+                "👤 Текущий пользователь:",
+                f"   ID: {user_info['user_id']}",
+                f"   Имя: {user_info['username']}",
+                f"   Дата регистрации: {user_info['registration_date']}",
+                "   Статус: активен",
+            )
         else:
-            print("❌ Ошибка: вы не авторизованы")
+            print(f"{_ERR} Ошибка: вы не авторизованы")
 
     def do_logout(self, _: str) -> None:
         """Выход из системы: logout"""
         success, message = self.user_manager.logout()
         if success:
-            print(f"✅ {message}")
+            print(f"{_OK} {message}")
             self.prompt = "> "
         else:
-            print(f"❌ {message}")
+            print(f"{_ERR} {message}")
 
     def do_listcurrencies(self, _: str) -> None:
         """
@@ -1051,10 +1350,11 @@ class TradingCLI(cmd.Cmd):
             currencies = get_all_currencies()
 
             if not currencies:
-                print("❌ Список валют пуст")
+                print(f"{_ERR} Список валют пуст")
                 return
 
-            print("📋 Доступные валюты:")
+            from prettytable import PrettyTable
+
             table = PrettyTable()
             table.field_names = ["Код", "Название", "Тип", "Доп. информация"]
             table.align["Код"] = "l"
@@ -1063,44 +1363,18 @@ class TradingCLI(cmd.Cmd):
             table.align["Доп. информация"] = "l"
 
             for code, currency in currencies.items():
-                currency_type = "FIAT" if "FIAT" in currency.get_display_info() else "CRYPTO"
+                # Тип берется из атрибута класса, без сборки строки get_display_info()
+                currency_type = currency.currency_type
                 if currency_type == "FIAT":
                     info = f"Страна: {currency.issuing_country}"
                 else:
                     info = f"Алгоритм: {currency.algorithm}"
                 table.add_row([code, currency.name, currency_type, info])
 
-            print(table)
-            print(f"\nВсего валют: {len(currencies)}")
-
-        except Exception as e:
-            print(f"❌ Ошибка при получении списка валют: {e}")
-
-    def do_updaterates_old(self, _: str) -> None:
-        """
-        Обновить курсы валют вручную: update-rates (старая версия)
-        """
-        try:
-            print("🔄 Обновление курсов валют (старая версия)...")
-            success, message = self.rate_manager.update_rates()
-
-            if success:
-                print(f"✅ {message}")
-                # Показываем информацию о последнем обновлении
-                if "last_refresh" in self.rate_manager._rates_data:
-                    last_refresh = self.rate_manager._rates_data["last_refresh"]
-                    try:
-                        dt = datetime.fromisoformat(last_refresh)
-                        time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-                        print(f"   📅 Время обновления: {time_str}")
-                    except (ValueError, TypeError):
-                        pass
-                print(f"   📊 Источник: {self.rate_manager._rates_data.get('source', 'неизвестен')}")
-            else:
-                print(f"❌ {message}")
+            self._emit("📋 Доступные валюты:", str(table), f"\nВсего валют: {len(currencies)}")
 
         except Exception as e:
-            print(f"❌ Ошибка при обновлении курсов: {e}")
+            print(f"{_ERR} Ошибка при получении списка валют: {e}")
 
     def do_viewlogs(self, arg: str) -> None:
         """
@@ -1108,96 +1382,74 @@ class TradingCLI(cmd.Cmd):
         Пример: view-logs
         Пример: view-logs --lines 10
         """
-        import os
+        try:
+            ns = self._parsers['view-logs'].parse_args(_split_cached(arg))
+        except argparse.ArgumentError:
+            print(_FORMAT_ERROR['view-logs'])
+            return
 
-        args = shlex.split(arg)
         lines = 5  # по умолчанию
-
-        i = 0
-        while i < len(args):
-            if args[i] == "--lines" and i + 1 < len(args):
-                try:
-                    lines = int(args[i + 1])
-                    i += 2
-                except ValueError:
-                    print("❌ Ошибка: количество строк должно быть числом")
-                    return
-            else:
-                print("❌ Ошибка: неверный формат команды")
-                print("Использование: view-logs [--lines N]")
-                print("Пример: view-logs --lines 10")
+        if ns.lines is not None:
+            try:
+                lines = int(ns.lines)
+            except ValueError:
+                print(f"{_ERR} Ошибка: количество строк должно быть числом")
+                return
+            if lines <= 0:
+                print(f"{_ERR} Ошибка: количество строк должно быть положительным числом")
                 return
 
         log_file = "logs/actions.log"
 
         if not os.path.exists(log_file):
-            print(f"❌ Файл логов не найден: {log_file}")
+            print(f"{_ERR} Файл логов не найден: {log_file}")
             return
 
         try:
+            # Файл читается потоково: в памяти остаются только последние N строк
             with open(log_file, 'r', encoding='utf-8') as f:
-                all_lines = f.readlines()
+                tail = collections.deque(f, maxlen=lines)
 
-            if not all_lines:
+            if not tail:
                 print("📝 Логи пусты")
                 return
 
-            print(f"📝 Последние {min(lines, len(all_lines))} записей логов:")
-            print("-" * 60)
-
-            for line in all_lines[-lines:]:
-                print(line.rstrip())
+            self._emit(
+                f"📝 Последние {len(tail)} записей логов:",
+                "-" * 60,
+                *(line.rstrip() for line in tail),
+            )
 
         except Exception as e:
-            print(f"❌ Ошибка при чтении логов: {e}")
+            print(f"{_ERR} Ошибка при чтении логов: {e}")
 
     # ===== Методы cmd.Cmd =====
+    def onecmd(self, line: str) -> bool:
+        """
+        Выполняет одну строку ввода через таблицу диспетчеризации.
+
+        Args:
+            line: Строка, введенная пользователем.
+
+        Returns:
+            bool: True, если нужно завершить цикл команд.
+        """
+        line = line.strip()
+        if not line:
+            return self.emptyline()
+        if line[0] == '?':
+            line = 'help ' + line[1:]
+
+        command, _, arg = line.partition(' ')
+        handler = self._COMMANDS.get(command)
+        if handler is None:
+            return self.default(line)
+        return handler(self, arg.strip())
+
     def default(self, line: str) -> None:
         """Обработка неизвестных команд."""
-        # Если команда show-portfolio, перенаправляем на showportfolio
-        if line.startswith('show-portfolio'):
-            new_line = line.replace('show-portfolio', 'showportfolio', 1)
-            self.onecmd(new_line)
-        # Если команда get-rate, перенаправляем на getrate (без дефиса)
-        elif line.startswith('get-rate'):
-            new_line = line.replace('get-rate', 'getrate', 1)
-            self.onecmd(new_line)
-        # Если команда update-rates (новая команда)
-        elif line.startswith('update-rates'):
-            self.do_updaterates(line.replace('update-rates', '', 1).strip())
-        # Если команда show-rates (новая команда)
-        elif line.startswith('show-rates'):
-            self.do_showrates(line.replace('show-rates', '', 1).strip())
-        # Если команда list-currencies
-        elif line.startswith('list-currencies'):
-            self.do_listcurrencies("")
-        # Если команда view-logs
-        elif line.startswith('view-logs'):
-            new_line = line.replace('view-logs', 'viewlogs', 1)
-            self.onecmd(new_line)
-        # Если команда parser-test
-        elif line.startswith('parser-test'):
-            self.do_parser_test("")
-        # Если команда update-all
-        elif line.startswith('update-all'):
-            self.do_update_all("")
-        # Если команда parser-status
-        elif line.startswith('parser-status'):
-            self.do_parser_status("")
-        # Если команда exchange-stats
-        elif line.startswith('exchange-stats'):
-            self.do_exchangestats("")
-        # Если команда view-history
-        elif line.startswith('view-history'):
-            new_line = line.replace('view-history', 'viewhistory', 1)
-            self.onecmd(new_line)
-        # Если команда cleanup-history
-        elif line.startswith('cleanup-history'):
-            new_line = line.replace('cleanup-history', 'cleanuphistory', 1)
-            self.onecmd(new_line)
-        else:
-            print(f"❌ Неизвестная команда: {line}")
-            print("   Введите 'help' для списка доступных команд")
+        self._emit(f"{_ERR} Неизвестная команда: {line}",
+                   "   Введите 'help' для списка доступных команд")
 
     def emptyline(self) -> None:
         """Обработка пустой строки."""
@@ -1206,86 +1458,80 @@ class TradingCLI(cmd.Cmd):
     def do_help(self, arg: str) -> None:
         """Показать справку по командам: help [command]"""
         if arg:
-            super().do_help(arg)
+            if TradingCLI._COMMAND_DOCS is None:
+                # inspect нужен только здесь: не загружаем его при старте консоли
+                import inspect
+
+                TradingCLI._COMMAND_DOCS = {
+                    name: inspect.cleandoc(func.__doc__)
+                    for name, func in self._COMMANDS.items() if func.__doc__
+                }
+            doc = TradingCLI._COMMAND_DOCS.get(arg)
+            if doc:
+                self.stdout.write(f"{doc}\n")
+            else:
+                super().do_help(arg)
         else:
-            print("\n📋 Доступные команды:\n")
-
-            commands_table = PrettyTable()
-            commands_table.field_names = ["Команда", "Описание", "Пример", "Возможные ошибки"]
-            commands_table.align["Команда"] = "l"
-            commands_table.align["Описание"] = "l"
-            commands_table.align["Пример"] = "l"
-            commands_table.align["Возможные ошибки"] = "l"
-
-            commands = [
-                # Основные команды пользователя
-                ("register", "Регистрация нового пользователя", "register --username alice --password 1234", "Username занят, пароль короткий"),
-                ("login", "Вход в систему", "login --username alice --password 1234", "Пользователь не найден, неверный пароль"),
-                ("logout", "Выход из системы", "logout", "-"),
-                ("whoami", "Инфо о текущем пользователе", "whoami", "-"),
-
-                # Работа с портфелем
-                ("showportfolio", "Показать портфель в USD", "showportfolio", "Требуется авторизация"),
-                ("showportfolio --base EUR", "Портфель в EUR", "showportfolio --base EUR", "Неизвестная базовая валюта"),
-                ("buy", "Купить валюту", "buy --currency BTC --amount 0.05", "Недостаточно средств, неизвестная валюта, неверная сумма"),
-                ("sell", "Продать валюту", "sell --currency BTC --amount 0.01", "Недостаточно средств, валюта не найдена, неверная сумма"),
-
-                # Курсы валют (старые команды)
-                ("getrate", "Получить курс между валютами", "getrate --from USD --to BTC", "Валюта не найдена, ошибка API"),
-                ("list-currencies", "Список поддерживаемых валют", "list-currencies", "-"),
-
-                # Курсы валют (новые команды)
-                ("update-rates", "Обновить все курсы", "update-rates", "Ошибка API"),
-                ("update-rates --source coingecko", "Обновить только криптовалюты", "update-rates --source coingecko", "Неизвестный источник"),
-                ("update-rates --source exchangerate", "Обновить только фиатные валюты", "update-rates --source exchangerate", "Неизвестный источник"),
-                ("show-rates", "Показать все курсы из кеша", "show-rates", "Кеш пуст"),
-                ("show-rates --currency BTC", "Курс конкретной валюты", "show-rates --currency BTC", "Валюта не найдена в кеше"),
-                ("show-rates --top 3", "Топ-3 криптовалют", "show-rates --top 3", "Нет криптовалют в кеше"),
-                ("show-rates --base EUR", "Курсы в EUR", "show-rates --base EUR", "Нет курса для базовой валюты"),
-
-                # Parser Service
-                ("update-all", "Обновить все курсы (старая команда)", "update-all", "-"),
-                ("parser-test", "Тест Parser Service", "parser-test", "-"),
-                ("parser-status", "Статус Parser Service", "parser-status", "-"),
-                ("exchange-stats", "Статистика исторических данных", "exchange-stats", "-"),
-                ("view-history", "История курса валюты", "view-history --currency BTC --limit 5", "-"),
-                ("cleanup-history", "Очистка старых записей", "cleanup-history --days 30", "-"),
-
-                # Логи и отладка
-                ("view-logs", "Просмотр логов", "view-logs --lines 10", "Файл логов не найден"),
-
-                # Выход
-                ("exit/quit", "Выход из приложения", "exit", "-"),
-                ("help", "Показать эту справку", "help", "-"),
-            ]
-
-            for cmd_name, desc, example, errors in commands:
-                commands_table.add_row([cmd_name, desc, example, errors])
-
-            print(commands_table)
-
-            print("\n🛑 Описание ошибок:")
-            print("  • InsufficientFundsError - недостаточно средств для операции")
-            print("  • CurrencyNotFoundError - неизвестная валюта (используйте list-currencies)")
-            print("  • ApiRequestError - ошибка при обращении к внешнему API")
-            print("  • InvalidAmountError - некорректная сумма (должна быть > 0)")
-            print("  • UserNotAuthenticatedError - требуется авторизация")
-
-            print("\n💡 Подсказки:")
-            print("  • Используйте list-currencies для просмотра доступных валют")
-            print("  • При ошибке ApiRequestError проверьте подключение к сети")
-            print("  • Логи операций сохраняются в папке logs/")
-            print("  • update-rates обновляет курсы через Parser Service")
-            print("  • show-rates показывает курсы из локального кеша")
-            print("  • Для реальных фиатных курсов нужен ключ ExchangeRate-API")
+            if TradingCLI._HELP_CACHE is None:
+                TradingCLI._HELP_CACHE = self._render_help() + '\n'
+            sys.stdout.write(TradingCLI._HELP_CACHE)
+
+    @staticmethod
+    def _render_help() -> str:
+        """
+        Формирует текст общей справки (таблица команд, ошибки, подсказки).
+
+        Returns:
+            str: Готовый к выводу текст справки.
+        """
+        from prettytable import PrettyTable
+
+        commands_table = PrettyTable()
+        commands_table.field_names = ["Команда", "Описание", "Пример", "Возможные ошибки"]
+        commands_table.align["Команда"] = "l"
+        commands_table.align["Описание"] = "l"
+        commands_table.align["Пример"] = "l"
+        commands_table.align["Возможные ошибки"] = "l"
+
+        for cmd_name, desc, example, errors in _HELP_COMMANDS:
+            commands_table.add_row([cmd_name, desc, example, errors])
+
+        return "\n".join([
+            "\n📋 Доступные команды:\n",
+            str(commands_table),
+            "\n🛑 Описание ошибок:",
+            "  • InsufficientFundsError - недостаточно средств для операции",
+            "  • CurrencyNotFoundError - неизвестная валюта (используйте list-currencies)",
+            "  • ApiRequestError - ошибка при обращении к внешнему API",
+            "  • InvalidAmountError - некорректная сумма (должна быть > 0)",
+            "  • UserNotAuthenticatedError - требуется авторизация",
+            "\n💡 Подсказки:",
+            "  • Используйте list-currencies для просмотра доступных валют",
+            "  • При ошибке ApiRequestError проверьте подключение к сети",
+            "  • Логи операций сохраняются в папке logs/",
+            "  • update-rates обновляет курсы через Parser Service",
+            "  • show-rates показывает курсы из локального кеша",
+            "  • Для реальных фиатных курсов нужен ключ ExchangeRate-API",
+        ])
+
+
+# Таблица команд строится один раз на класс, а не на каждый экземпляр
+TradingCLI._COMMANDS = {
+    name[3:]: func for name, func in vars(TradingCLI).items() if name.startswith('do_')
+}
+for _alias, _command in TradingCLI._ALIASES.items():
+    TradingCLI._COMMANDS[_alias] = TradingCLI._COMMANDS[_command]
 
 
 def run_cli() -> None:
     """Запуск CLI интерфейса."""
     try:
         cli = TradingCLI()
+        # Для ввода из файла/канала readline не нужен: строки читаются напрямую из stdin
+        if not sys.stdin.isatty():
+            cli.use_rawinput = False
         cli.cmdloop()
     except KeyboardInterrupt:
         print("\n\n👋 Прервано пользователем. До свидания!")
     except Exception as e:
-        print(f"❌ Критическая ошибка: {e}")
+        print(f"{_ERR} Критическая ошибка: {e}")
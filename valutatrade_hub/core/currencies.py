@@ -7,6 +7,9 @@ from .exceptions import CurrencyNotFoundError
 class Currency(ABC):
     """Абстрактный базовый класс для валют."""
 
+    # Тип валюты для UI ("FIAT" или "CRYPTO"), задается в подклассах
+    currency_type: str = ""
+
     def __init__(self, name: str, code: str):
         """
         Инициализация валюты.
@@ -76,6 +79,8 @@ class Currency(ABC):
 class FiatCurrency(Currency):
     """Класс, представляющий фиатную валюту."""
 
+    currency_type = "FIAT"
+
     def __init__(self, name: str, code: str, issuing_country: str):
         """
         Инициализация фиатной валюты.
@@ -113,6 +118,8 @@ class FiatCurrency(Currency):
 class CryptoCurrency(Currency):
     """Класс, представляющий криптовалюту."""
 
+    currency_type = "CRYPTO"
+
     def __init__(self, name: str, code: str, algorithm: str, market_cap: float = 0.0):
         """
         Инициализация криптовалюты.
@@ -4,10 +4,22 @@ from typing import Optional
 
 from .exceptions import InsufficientFundsError  # Добавляем импорт
 
+# Фиксированные курсы для упрощения (используются только в Portfolio.get_total_value;
+# CLI считает итог портфеля по актуальным курсам, см. PortfolioManager.show_portfolio)
+_PORTFOLIO_EXCHANGE_RATES = {
+    'USD': {'USD': 1.0, 'EUR': 0.92, 'BTC': 0.000025, 'RUB': 95.0, 'ETH': 0.00027},
+    'EUR': {'USD': 1.08, 'EUR': 1.0, 'BTC': 0.000027, 'RUB': 102.0, 'ETH': 0.00029},
+    'BTC': {'USD': 40000.0, 'EUR': 37000.0, 'BTC': 1.0, 'RUB': 3800000.0, 'ETH': 10.5},
+    'RUB': {'USD': 0.0105, 'EUR': 0.0098, 'BTC': 0.00000026, 'RUB': 1.0, 'ETH': 0.0000028},
+    'ETH': {'USD': 3720.0, 'EUR': 3400.0, 'BTC': 0.093, 'RUB': 350000.0, 'ETH': 1.0}
+}
+
 
 class User:
     """Класс, представляющий пользователя системы."""
 
+    __slots__ = ('_user_id', '_username', '_salt', '_hashed_password', '_registration_date')
+
     def __init__(self, username: str, password: str, user_id: Optional[int] = None):
         """
         Инициализация пользователя.
@@ -116,6 +128,8 @@ class User:
 class Wallet:
     """Класс, представляющий кошелёк для хранения баланса в конкретной валюте."""
 
+    __slots__ = ('currency_code', '_balance')
+
     def __init__(self, currency_code: str, balance: float = 0.0):
         """
         Инициализация кошелька.
@@ -230,6 +244,8 @@ class Wallet:
 class Portfolio:
     """Класс, представляющий портфель всех кошельков одного пользователя."""
 
+    __slots__ = ('_user_id', '_wallets')
+
     def __init__(self, user_id: int, wallets: dict[str, Wallet] = None):
         """
         Инициализация портфеля пользователя.
@@ -296,20 +312,16 @@ class Portfolio:
         """
         Рассчитывает общую стоимость всех валют в портфеле в базовой валюте.
 
+        Использует фиксированные курсы _PORTFOLIO_EXCHANGE_RATES. Команда showportfolio
+        этот метод не вызывает: итог в ней суммируется из строк, пересчитанных по текущим курсам.
+
         Args:
             base_currency: Код базовой валюты для расчета стоимости.
 
         Returns:
             float: Общая стоимость портфеля в базовой валюте.
         """
-        # Фиксированные курсы для упрощения
-        exchange_rates = {
-            'USD': {'USD': 1.0, 'EUR': 0.92, 'BTC': 0.000025, 'RUB': 95.0, 'ETH': 0.00027},
-            'EUR': {'USD': 1.08, 'EUR': 1.0, 'BTC': 0.000027, 'RUB': 102.0, 'ETH': 0.00029},
-            'BTC': {'USD': 40000.0, 'EUR': 37000.0, 'BTC': 1.0, 'RUB': 3800000.0, 'ETH': 10.5},
-            'RUB': {'USD': 0.0105, 'EUR': 0.0098, 'BTC': 0.00000026, 'RUB': 1.0, 'ETH': 0.0000028},
-            'ETH': {'USD': 3720.0, 'EUR': 3400.0, 'BTC': 0.093, 'RUB': 350000.0, 'ETH': 1.0}
-        }
+        exchange_rates = _PORTFOLIO_EXCHANGE_RATES
 
         # Приводим к верхнему регистру
         base_currency = base_currency.upper()
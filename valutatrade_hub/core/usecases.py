@@ -1,6 +1,7 @@
 import os
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from ..decorators import log_action
 from ..infra.settings import settings
@@ -20,6 +21,26 @@ from .utils import DataManager, InputValidator
 logger = get_logger(__name__)
 
 
+def _time_of_day(updated_at: Any) -> Any:
+    """
+    Выделяет время HH:MM:SS из отметки updated_at для вывода.
+
+    Args:
+        updated_at: Отметка времени в ISO-формате (как пишет Parser Service).
+
+    Returns:
+        Время 'HH:MM:SS' или исходное значение, если это не строка.
+    """
+    if not isinstance(updated_at, str):
+        return updated_at
+    # Обычный случай: 'YYYY-MM-DDTHH:MM:SS...' — время берется срезом без split
+    if updated_at[10:11] == 'T':
+        return updated_at[11:19]
+    if 'T' in updated_at:
+        return updated_at.partition('T')[2][:8]
+    return updated_at[:8]
+
+
 class UserManager:
     """Менеджер для работы с пользователями."""
 
@@ -147,13 +168,50 @@ class UserManager:
         return next((u for u in self._users if u.user_id == user_id), None)
 
 
+@dataclass
+class TradeResult:
+    """
+    Результат успешной сделки (buy/sell) для вывода в CLI.
+
+    Атрибуты:
+        headline: Основная строка результата (что и по какому курсу исполнено).
+        details: Дополнительные строки (оценочная стоимость/выручка).
+    """
+
+    headline: str
+    details: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return ". ".join([self.headline, *self.details])
+
+
 class PortfolioManager:
     """Менеджер для работы с портфелями пользователей."""
 
-    def __init__(self, user_manager: UserManager):
+    def __init__(self, user_manager: UserManager, rate_manager: Optional["RateManager"] = None):
+        """
+        Инициализация менеджера портфелей.
+
+        Args:
+            user_manager: Менеджер пользователей.
+            rate_manager: Общий RateManager для курсов сделок
+                (если не задан, создается собственный при первой сделке).
+        """
         self._user_manager = user_manager
+        self._rate_manager = rate_manager
         self._portfolios: Dict[int, Portfolio] = self._load_portfolios()
 
+    def _get_rate_manager(self) -> "RateManager":
+        """
+        Возвращает RateManager для сделок, создавая его один раз.
+
+        Returns:
+            RateManager: Общий (переданный при создании) или собственный экземпляр.
+        """
+        if self._rate_manager is None:
+            self._rate_manager = RateManager()
+        return self._rate_manager
+
     def _load_portfolios(self) -> Dict[int, Portfolio]:
         """Загружает портфели из JSON-файла."""
         data_dir = settings.get("database.path", "data")
@@ -222,7 +280,7 @@ class PortfolioManager:
         return self._portfolios[user_id]
 
     @log_action(action_name='BUY', verbose=True)
-    def buy_currency(self, currency_code: str, amount: float) -> Tuple[bool, str]:
+    def buy_currency(self, currency_code: str, amount: float) -> Tuple[bool, Union[TradeResult, str]]:
         """
         Покупка валюты.
 
@@ -231,7 +289,8 @@ class PortfolioManager:
             amount: Сумма для покупки.
 
         Returns:
-            Tuple[bool, str]: (успех, сообщение)
+            Tuple[bool, Union[TradeResult, str]]: (True, TradeResult) при успехе,
+            (False, сообщение об ошибке) в противном случае.
 
         Raises:
             UserNotAuthenticatedError: Если пользователь не авторизован.
@@ -266,8 +325,7 @@ class PortfolioManager:
             return False, "Ошибка при получении портфеля"
 
         # Получаем курс через RateManager (с TTL кешем)
-        rate_manager = RateManager()
-        success, message, rate, updated_at = rate_manager.get_rate(currency_code, 'USD')
+        success, message, rate, updated_at = self._get_rate_manager().get_rate(currency_code, 'USD')
 
         if not success or rate is None:
             raise ApiRequestError(f"Не удалось получить курс для {currency_code}→USD: {message}")
@@ -308,7 +366,10 @@ class PortfolioManager:
             if self._save_portfolios():
                 # Возвращаем оценочную стоимость
                 estimated_cost = amount * rate
-                return True, f"Покупка выполнена: {amount:.4f} {currency_code} по курсу {rate:.2f} USD/{currency_code}. Оценочная стоимость: ${estimated_cost:.2f}"
+                return True, TradeResult(
+                    f"Покупка выполнена: {amount:.4f} {currency_code} по курсу {rate:.2f} USD/{currency_code}",
+                    [f"Оценочная стоимость: ${estimated_cost:.2f}"],
+                )
             else:
                 # Откат транзакции в случае ошибки сохранения
                 usd_wallet.deposit(cost_usd)
@@ -321,7 +382,7 @@ class PortfolioManager:
             return False, f"Ошибка при выполнении операции: {str(e)}"
 
     @log_action(action_name='SELL', verbose=True)
-    def sell_currency(self, currency_code: str, amount: float) -> Tuple[bool, str]:
+    def sell_currency(self, currency_code: str, amount: float) -> Tuple[bool, Union[TradeResult, str]]:
         """
         Продажа валюты.
 
@@ -330,7 +391,8 @@ class PortfolioManager:
             amount: Сумма для продажи.
 
         Returns:
-            Tuple[bool, str]: (успех, сообщение)
+            Tuple[bool, Union[TradeResult, str]]: (True, TradeResult) при успехе,
+            (False, сообщение об ошибке) в противном случае.
 
         Raises:
             UserNotAuthenticatedError: Если пользователь не авторизован.
@@ -381,8 +443,7 @@ class PortfolioManager:
             raise InsufficientFundsError(current_balance, amount, currency_code)
 
         # Получаем курс через RateManager (с TTL кешем)
-        rate_manager = RateManager()
-        success, message, rate, updated_at = rate_manager.get_rate(currency_code, 'USD')
+        success, message, rate, updated_at = self._get_rate_manager().get_rate(currency_code, 'USD')
 
         if not success or rate is None:
             raise ApiRequestError(f"Не удалось получить курс для {currency_code}→USD: {message}")
@@ -413,7 +474,10 @@ class PortfolioManager:
             if self._save_portfolios():
                 # Возвращаем оценочную выручку
                 estimated_revenue = amount * rate
-                return True, f"Продажа выполнена: {amount:.4f} {currency_code} по курсу {rate:.2f} USD/{currency_code}. Оценочная выручка: ${estimated_revenue:.2f}"
+                return True, TradeResult(
+                    f"Продажа выполнена: {amount:.4f} {currency_code} по курсу {rate:.2f} USD/{currency_code}",
+                    [f"Оценочная выручка: ${estimated_revenue:.2f}"],
+                )
             else:
                 # Откат транзакции в случае ошибки сохранения
                 source_wallet.deposit(amount)
@@ -433,7 +497,8 @@ class PortfolioManager:
             base_currency: Базовая валюта для расчета стоимости.
 
         Returns:
-            Tuple[bool, str, Optional[Dict]]: (успех, сообщение, данные портфеля)
+            Tuple[bool, str, Optional[Dict]]: (успех, сообщение, данные портфеля
+            {"data": {валюта: баланс}})
         """
         if not self._user_manager.is_logged_in:
             return False, "Сначала выполните login", None
@@ -448,19 +513,14 @@ class PortfolioManager:
 
         # Проверяем, есть ли кошельки
         if not portfolio.wallets:
-            return True, "Портфель пуст", {"data": {}, "total_value": 0.0}
+            return True, "Портфель пуст", {"data": {}}
 
-        # Получаем данные портфеля
-        portfolio_data = {}
-        total_value = portfolio.get_total_value(base_currency)
+        # Получаем балансы (валюты в алфавитном порядке для стабильного вывода);
+        # стоимость в базовой валюте считает вызывающий код по актуальным курсам
+        wallets = portfolio.wallets
+        portfolio_data = {code: wallets[code].balance for code in sorted(wallets)}
 
-        for currency_code, wallet in portfolio.wallets.items():
-            portfolio_data[currency_code] = wallet.balance
-
-        return True, "Портфель загружен", {
-            "data": portfolio_data,
-            "total_value": total_value
-        }
+        return True, "Портфель загружен", {"data": portfolio_data}
 
     def get_wallet_balance(self, currency_code: str) -> Optional[float]:
         """
@@ -485,8 +545,22 @@ class PortfolioManager:
 class RateManager:
     """Менеджер для работы с курсами валют с TTL кешем в новом формате."""
 
-    def __init__(self):
+    def __init__(self, update_runner: Optional[Callable[[], Dict]] = None):
+        """
+        Инициализация менеджера курсов.
+
+        Args:
+            update_runner: Функция, выполняющая обновление курсов и возвращающая
+                результат RatesUpdater.run_update (в CLI — TradingCLI._run_update).
+                Если не задана, используется собственный RatesUpdater.
+        """
+        self._update_runner = update_runner
+        self._rates_updater = None
         self._rates_data = self._load_rates()
+        # Отформатированное время last_refresh (сбрасывается при перезагрузке кеша)
+        self._last_refresh_display: Optional[str] = None
+        # Готовые представления курсов для show-rates (сбрасываются при перезагрузке кеша)
+        self._rates_views: Dict[Tuple[str, frozenset], Dict[str, Any]] = {}
         # Использование TTL из SettingsLoader
         cache_minutes = settings.get("api.rates_cache_duration_minutes", 5)
         self._CACHE_DURATION = timedelta(minutes=cache_minutes)
@@ -596,6 +670,10 @@ class RateManager:
             CurrencyNotFoundError: Если валюта не найдена.
             ApiRequestError: Если не удалось обновить курс.
         """
+        # Коды нормализуются один раз и дальше используются как есть
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+
         # Валидация валют через get_currency()
         try:
             get_currency(from_currency)  # Проверяем исходную валюту
@@ -603,9 +681,6 @@ class RateManager:
         except CurrencyNotFoundError as e:
             raise e
 
-        from_currency = from_currency.upper()
-        to_currency = to_currency.upper()
-
         # Пытаемся получить свежий курс из кеша
         rate, updated_at = self._get_rate_from_cache(from_currency, to_currency)
 
@@ -660,6 +735,100 @@ class RateManager:
         """
         return self._rates_data.copy()
 
+    def get_last_refresh_display(self) -> str:
+        """
+        Возвращает время последнего обновления кеша в формате для вывода.
+
+        Строка разбирается один раз на каждую загрузку кеша.
+
+        Returns:
+            str: Время в формате 'YYYY-MM-DD HH:MM:SS' или исходное значение,
+            если его не удалось разобрать.
+        """
+        if self._last_refresh_display is None:
+            last_refresh = self._rates_data.get("last_refresh") or "неизвестно"
+            try:
+                # fromisoformat до Python 3.11 не принимает суффикс 'Z'
+                dt = datetime.fromisoformat(last_refresh.replace('Z', '+00:00'))
+                self._last_refresh_display = dt.strftime("%Y-%m-%d %H:%M:%S")
+            except (ValueError, TypeError):
+                self._last_refresh_display = last_refresh
+        return self._last_refresh_display
+
+    def get_rates_view(self, base_currency: str = 'USD',
+                       crypto_codes: frozenset = frozenset()) -> Dict[str, Any]:
+        """
+        Возвращает курсы из кеша, пересчитанные к базовой валюте и разделенные на крипто/фиат.
+
+        Результат вычисляется за один проход по парам и запоминается до перезагрузки кеша.
+        Возвращаемые списки общие для всех вызовов — их нельзя изменять.
+
+        Args:
+            base_currency: Базовая валюта (курсы пересчитываются через USD).
+            crypto_codes: Коды валют, которые относятся к криптовалютам.
+
+        Returns:
+            Словарь с ключами:
+                pairs_count: Количество пар в кеше.
+                base_rate: Курс базовой валюты к USD или None, если его нет в кеше.
+                crypto: [(валюта, курс, время обновления HH:MM:SS)] по убыванию курса.
+                fiat: [(валюта, курс, время обновления HH:MM:SS)] по алфавиту.
+        """
+        key = (base_currency, crypto_codes)
+        view = self._rates_views.get(key)
+        if view is not None:
+            return view
+
+        pairs = self._rates_data.get("pairs") or {}
+        crypto_rates = []
+        fiat_rates = []
+
+        if base_currency == 'USD':
+            base_rate = 1.0
+        else:
+            base_pair = pairs.get(f"{base_currency}_USD")
+            base_rate = base_pair["rate"] if base_pair is not None else None
+
+        if base_rate is not None:
+            for pair_key, pair_data in pairs.items():
+                currency, _, to_currency = pair_key.partition('_')
+
+                # Берем только пары к USD, пропуская саму базовую валюту
+                if to_currency != "USD" or currency == base_currency or currency == "USD":
+                    continue
+
+                rate = pair_data["rate"]
+                if base_currency != 'USD':
+                    rate = rate / base_rate if base_rate != 0 else 0
+
+                entry = (currency, rate, _time_of_day(pair_data.get("updated_at", "неизвестно")))
+                (crypto_rates if currency in crypto_codes else fiat_rates).append(entry)
+
+            crypto_rates.sort(key=lambda x: x[1], reverse=True)
+            fiat_rates.sort(key=lambda x: x[0])
+
+        view = {
+            "pairs_count": len(pairs),
+            "base_rate": base_rate,
+            "crypto": crypto_rates,
+            "fiat": fiat_rates,
+        }
+        self._rates_views[key] = view
+        return view
+
+    def _get_updater(self):
+        """
+        Возвращает RatesUpdater для обновления курсов, создавая его один раз.
+
+        Returns:
+            RatesUpdater: Собственный экземпляр менеджера.
+        """
+        if self._rates_updater is None:
+            from ..parser_service.updater import RatesUpdater
+
+            self._rates_updater = RatesUpdater()
+        return self._rates_updater
+
     def update_rates(self) -> bool:
         """
         Обновляет курсы валют через Parser Service.
@@ -671,12 +840,13 @@ class RateManager:
             ApiRequestError: Если произошла ошибка при обновлении.
         """
         try:
-            # Используем Parser Service для обновления
-            from ..parser_service.updater import RatesUpdater
-
-            updater = RatesUpdater()
-            # ИСПРАВЛЕНИЕ: используем новый метод run_update() вместо update_all_rates()
-            result = updater.run_update()
+            # Используем Parser Service для обновления: через update_runner, если он задан,
+            # иначе через собственный RatesUpdater (переиспользуется между обновлениями)
+            if self._update_runner is not None:
+                result = self._update_runner()
+            else:
+                # ИСПРАВЛЕНИЕ: используем новый метод run_update() вместо update_all_rates()
+                result = self._get_updater().run_update()
 
             # ИСПРАВЛЕНИЕ: проверяем наличие поля 'pairs' в новом формате
             if result and 'pairs' in result:
@@ -702,6 +872,8 @@ class RateManager:
         try:
             old_data = self._rates_data
             self._rates_data = self._load_rates()
+            self._last_refresh_display = None
+            self._rates_views.clear()
 
             old_count = len(old_data.get("pairs", {}))
             new_count = len(self._rates_data.get("pairs", {}))
@@ -1,9 +1,8 @@
 import json
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
-
-from prettytable import PrettyTable
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from .exceptions import ApiRequestError  # Добавляем импорт
 
@@ -121,37 +120,51 @@ class InputValidator:
 class CurrencyService:
     """Сервис для работы с курсами валют (заглушка пока нет Parser Service)."""
 
+    # Фиксированные курсы для тестирования
+    _FIXED_RATES = {
+        'USD': {'USD': 1.0, 'EUR': 0.92, 'BTC': 0.000025, 'RUB': 95.0},
+        'EUR': {'USD': 1.08, 'EUR': 1.0, 'BTC': 0.000027, 'RUB': 102.0},
+        'BTC': {'USD': 40000.0, 'EUR': 37000.0, 'BTC': 1.0, 'RUB': 3800000.0},
+        'RUB': {'USD': 0.0105, 'EUR': 0.0098, 'BTC': 0.00000026, 'RUB': 1.0},
+        'ETH': {'USD': 3720.0, 'BTC': 0.093, 'EUR': 3400.0}
+    }
+
+    # Сколько секунд полученный курс переиспользуется без повторного обращения к API
+    _CACHE_TTL = 5.0
+
+    def __init__(self):
+        # (из, в) -> (курс, момент устаревания); ошибки API и ненайденные курсы в кеш не попадают
+        self._cache: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
     @staticmethod
-    def get_exchange_rate(from_currency: str, to_currency: str = 'USD') -> Optional[float]:
+    def _simulate_api_call(message: str) -> None:
         """
-        Получает курс обмена между валютами.
+        Имитирует обращение к API курсов.
 
         Args:
-            from_currency: Исходная валюта.
-            to_currency: Целевая валюта.
-
-        Returns:
-            Курс обмена или None если курс не найден.
+            message: Текст ошибки при имитации сбоя.
 
         Raises:
-            ApiRequestError: Если произошла ошибка при обращении к API (заглушка).
+            ApiRequestError: С вероятностью 10% (заглушка).
         """
         # Для демонстрации ApiRequestError - с вероятностью 10% имитируем сбой API
         import random
         if random.random() < 0.1:  # 10% chance
-            raise ApiRequestError("Временная недоступность сервиса курсов")
-
-        # Фиксированные курсы для тестирования
-        fixed_rates = {
-            'USD': {'USD': 1.0, 'EUR': 0.92, 'BTC': 0.000025, 'RUB': 95.0},
-            'EUR': {'USD': 1.08, 'EUR': 1.0, 'BTC': 0.000027, 'RUB': 102.0},
-            'BTC': {'USD': 40000.0, 'EUR': 37000.0, 'BTC': 1.0, 'RUB': 3800000.0},
-            'RUB': {'USD': 0.0105, 'EUR': 0.0098, 'BTC': 0.00000026, 'RUB': 1.0},
-            'ETH': {'USD': 3720.0, 'BTC': 0.093, 'EUR': 3400.0}
-        }
+            raise ApiRequestError(message)
 
-        from_currency = from_currency.upper()
-        to_currency = to_currency.upper()
+    @classmethod
+    def _lookup_rate(cls, from_currency: str, to_currency: str) -> Optional[float]:
+        """
+        Ищет курс в таблице фиксированных курсов.
+
+        Args:
+            from_currency: Исходная валюта (в верхнем регистре).
+            to_currency: Целевая валюта (в верхнем регистре).
+
+        Returns:
+            Курс обмена или None если курс не найден.
+        """
+        fixed_rates = cls._FIXED_RATES
 
         if from_currency in fixed_rates and to_currency in fixed_rates[from_currency]:
             return fixed_rates[from_currency][to_currency]
@@ -163,6 +176,94 @@ class CurrencyService:
 
         return None
 
+    def _cached_rate(self, from_currency: str, to_currency: str, now: float) -> Tuple[bool, Optional[float]]:
+        """
+        Ищет еще не устаревший курс в кеше сервиса.
+
+        Args:
+            from_currency: Исходная валюта (в верхнем регистре).
+            to_currency: Целевая валюта (в верхнем регистре).
+            now: Текущее значение time.monotonic().
+
+        Returns:
+            Кортеж (найден ли курс в кеше, курс или None).
+        """
+        entry = self._cache.get((from_currency, to_currency))
+        if entry is not None and entry[1] > now:
+            return True, entry[0]
+        return False, None
+
+    def get_exchange_rate(self, from_currency: str, to_currency: str = 'USD') -> Optional[float]:
+        """
+        Получает курс обмена между валютами.
+
+        Повторный запрос той же пары в течение _CACHE_TTL секунд отвечается из кеша.
+
+        Args:
+            from_currency: Исходная валюта.
+            to_currency: Целевая валюта.
+
+        Returns:
+            Курс обмена или None если курс не найден.
+
+        Raises:
+            ApiRequestError: Если произошла ошибка при обращении к API (заглушка).
+        """
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        now = time.monotonic()
+
+        found, rate = self._cached_rate(from_currency, to_currency, now)
+        if found:
+            return rate
+
+        # При ошибке исключение уходит вызывающему коду, а кеш остается без записи
+        self._simulate_api_call("Временная недоступность сервиса курсов")
+        rate = self._lookup_rate(from_currency, to_currency)
+        if rate is not None:
+            self._cache[(from_currency, to_currency)] = (rate, now + self._CACHE_TTL)
+        return rate
+
+    def get_exchange_rates(self, from_currencies: Iterable[str],
+                           to_currency: str = 'USD') -> Dict[str, float]:
+        """
+        Получает курсы нескольких валют к одной целевой за одно обращение.
+
+        Если все курсы есть в кеше и не устарели, обращения к API не происходит.
+
+        Args:
+            from_currencies: Исходные валюты.
+            to_currency: Целевая валюта.
+
+        Returns:
+            Словарь {валюта: курс}; валюты без курса в словарь не попадают.
+
+        Raises:
+            ApiRequestError: Если произошла ошибка при обращении к API (заглушка).
+        """
+        to_currency = to_currency.upper()
+        now = time.monotonic()
+
+        rates = {}
+        missing = []
+        for code in from_currencies:
+            found, rate = self._cached_rate(code.upper(), to_currency, now)
+            if not found:
+                missing.append(code)
+            elif rate:
+                rates[code] = rate
+
+        if missing:
+            self._simulate_api_call("Временная недоступность сервиса курсов")
+            expires_at = now + self._CACHE_TTL
+            for code in missing:
+                rate = self._lookup_rate(code.upper(), to_currency)
+                if rate is not None:
+                    self._cache[(code.upper(), to_currency)] = (rate, expires_at)
+                if rate:
+                    rates[code] = rate
+        return rates
+
     @staticmethod
     def get_all_rates() -> Dict[str, Dict[str, Any]]:
         """
@@ -214,6 +315,8 @@ def format_portfolio_table(portfolio_data: Dict[str, float], total_value: float)
     Returns:
         Отформатированная таблица.
     """
+    from prettytable import PrettyTable
+
     table = PrettyTable()
     table.field_names = ["Валюта", "Баланс", "Курс к USD", "Стоимость в USD"]
     table.align["Валюта"] = "l"
@@ -246,6 +349,8 @@ def format_rates_table(rates_data: Dict[str, Dict[str, Any]]) -> str:
     Returns:
         Отформатированная таблица.
     """
+    from prettytable import PrettyTable
+
     table = PrettyTable()
     table.field_names = ["Пара", "Курс", "Обновлено"]
     table.align["Пара"] = "l"
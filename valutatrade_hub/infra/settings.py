@@ -61,6 +61,8 @@ class SettingsLoader:
             },
             "api": {
                 "rates_cache_duration_minutes": 5,  # TTL кеша в минутах
+                "cli_rate_cache_seconds": 30,  # TTL кеша команды getrate в секундах
+                "cli_update_cache_seconds": 60,  # Повторное обновление курсов из CLI не чаще (секунды)
                 "max_cache_pairs": 100,  # Максимальное количество пар в кеше
                 "max_retries": 3,
                 "timeout_seconds": 10
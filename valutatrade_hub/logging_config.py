@@ -1,8 +1,53 @@
+import atexit
+import copy
 import json
 import logging
 import logging.handlers
 import os
+import queue
 from datetime import datetime
+from typing import Optional
+
+# Фоновый поток, который пишет записи в файловые обработчики
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, сохраняющий в записи exc_info и дополнительные поля.
+
+    Стандартный prepare() форматирует запись целиком и убирает exc_info,
+    а JSON-формату логов действий нужны исходные поля (exc_info, action, username и т.д.).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Готовит копию записи для очереди.
+
+        Сообщение подставляется (msg % args) еще в потоке вызывающего кода:
+        изменение аргументов после вызова логгера не влияет на строку лога,
+        а ошибка форматирования не возникает в фоновом потоке.
+
+        Args:
+            record: Исходная запись.
+
+        Returns:
+            logging.LogRecord: Копия записи с готовым msg и пустыми args.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _stop_queue_listener() -> None:
+    """Останавливает фоновую запись логов, дописывая оставшиеся в очереди записи."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
 
 
 def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: bool = False) -> None:
@@ -14,6 +59,8 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: b
         log_dir: Директория для хранения логов.
         json_format: Использовать ли JSON формат для логов действий.
     """
+    global _queue_listener
+
     # Создаем директорию для логов если её нет
     os.makedirs(log_dir, exist_ok=True)
 
@@ -25,6 +72,7 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: b
     logger.setLevel(level)
 
     # Очищаем существующие обработчики
+    _stop_queue_listener()
     logger.handlers.clear()
 
     # 1. КОНСОЛЬНЫЙ обработчик (простой формат для вывода в терминал)
@@ -46,7 +94,6 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: b
     file_handler.setLevel(level)
     file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s", "%Y-%m-%d %H:%M:%S")
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
 
     # 3. ОБРАБОТЧИК ДЛЯ АКТИВНОСТЕЙ (специальный формат только для действий)
     actions_file = os.path.join(log_dir, "actions.log")
@@ -140,7 +187,6 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: b
     actions_handler.setFormatter(actions_formatter)
     # Только логи с действиями (с полем 'action')
     actions_handler.addFilter(lambda record: hasattr(record, 'action') and getattr(record, 'action', ''))
-    logger.addHandler(actions_handler)
 
     # 4. ОБРАБОТЧИК ДЛЯ ОШИБОК
     error_file = os.path.join(log_dir, "errors.log")
@@ -153,7 +199,14 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs", json_format: b
     error_handler.setLevel(logging.ERROR)
     error_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s", "%Y-%m-%d %H:%M:%S")
     error_handler.setFormatter(error_formatter)
-    logger.addHandler(error_handler)
+
+    # Файловые обработчики работают в фоновом потоке: команда только кладет запись в очередь
+    log_queue = queue.SimpleQueue()
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, actions_handler, error_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    logger.addHandler(_RecordQueueHandler(log_queue))
 
     # Логируем начало сессии (пойдут в общие логи, НЕ в actions.log)
     logging.info("=== Начало сессии логирования ===")
@@ -4,6 +4,8 @@
 """
 
 import json
+import os
+import tempfile
 import time
 import urllib.error
 import urllib.request
@@ -145,11 +147,59 @@ class CoinGeckoClient(BaseApiClient):
             retry_delay=config.RETRY_DELAY
         )
         self.base_url = config.COINGECKO_URL
+        self.cache_path = config.COINGECKO_CACHE_PATH
+        self.cache_ttl = config.COINGECKO_CACHE_TTL
 
-    def fetch_rates(self) -> Dict[str, float]:
+    def _load_cached_rates(self, url: str) -> Optional[Dict[str, float]]:
+        """
+        Возвращает курсы из дискового кеша, если они получены по тому же URL и не устарели.
+
+        Args:
+            url: URL запроса (ключ кеша: эндпоинт и параметры).
+
+        Returns:
+            Словарь курсов или None, если подходящей записи нет.
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        if time.time() - entry.get("fetched_at", 0) >= self.cache_ttl:
+            return None
+        return entry.get("rates") or None
+
+    def _save_cached_rates(self, url: str, rates: Dict[str, float]) -> None:
+        """
+        Атомарно сохраняет успешный ответ в дисковый кеш (ошибки не кешируются).
+
+        Args:
+            url: URL запроса (ключ кеша).
+            rates: Полученные курсы.
+        """
+        entry = {"url": url, "fetched_at": time.time(), "rates": rates}
+        try:
+            cache_dir = os.path.dirname(self.cache_path) or "."
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                'w', suffix='.json', dir=cache_dir, delete=False, encoding='utf-8'
+            ) as f:
+                json.dump(entry, f)
+            os.replace(f.name, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кеш CoinGecko: {e}")
+
+    def fetch_rates(self, use_cache: bool = True) -> Dict[str, float]:
         """
         Получает курсы криптовалют от CoinGecko API.
 
+        Args:
+            use_cache: Вернуть недавний ответ из дискового кеша, если он есть
+                (False — всегда запрашивать API; свежий ответ все равно кешируется).
+
         Returns:
             Словарь с курсами в формате {crypto_USD: rate}.
 
@@ -172,6 +222,12 @@ class CoinGeckoClient(BaseApiClient):
             query_string = urlencode(params)
             url = f"{self.base_url}?{query_string}"
 
+            # Недавний ответ на тот же запрос берем с диска, не расходуя лимит CoinGecko
+            cached_rates = self._load_cached_rates(url) if use_cache else None
+            if cached_rates is not None:
+                logger.info(f"Курсы криптовалют взяты из кеша CoinGecko ({len(cached_rates)} курсов)")
+                return cached_rates
+
             # Выполняем запрос через базовый класс
             response_data = self._make_request(url)
 
@@ -193,6 +249,8 @@ class CoinGeckoClient(BaseApiClient):
                     logger.warning(f"Данные для {ticker} ({coin_id}) не найдены в ответе")
 
             logger.info(f"Получено {len(rates)} курсов криптовалют от CoinGecko")
+            if rates:
+                self._save_cached_rates(url, rates)
             return rates
 
         except ApiRequestError:
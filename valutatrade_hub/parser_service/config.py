@@ -24,11 +24,13 @@ class ParserConfig:
         CRYPTO_ID_MAP: Сопоставление кодов валют с ID CoinGecko
         RATES_FILE_PATH: Путь к файлу кеша курсов
         HISTORY_FILE_PATH: Путь к файлу исторических данных
+        COINGECKO_CACHE_PATH: Путь к файлу дискового кеша ответов CoinGecko
         REQUEST_TIMEOUT: Таймаут запросов в секундах
         UPDATE_INTERVAL: Интервал обновления в секундах
         MAX_RETRIES: Максимальное количество повторных попыток
         RETRY_DELAY: Задержка между попытками в секундах
         RATES_CACHE_TTL_MINUTES: TTL кеша курсов в минутах
+        COINGECKO_CACHE_TTL: TTL дискового кеша CoinGecko в секундах
     """
 
     # ===== API КЛЮЧИ (из переменных окружения) =====
@@ -66,6 +68,7 @@ class ParserConfig:
     # ===== ПУТИ К ФАЙЛАМ =====
     RATES_FILE_PATH: str = "data/rates.json"
     HISTORY_FILE_PATH: str = "data/exchange_rates.json"
+    COINGECKO_CACHE_PATH: str = "data/coingecko_cache.json"
     PARSER_LOG_FILE: str = "logs/parser_service.log"
 
     # ===== ПАРАМЕТРЫ ЗАПРОСОВ =====
@@ -79,6 +82,7 @@ class ParserConfig:
 
     # ===== НАСТРОЙКИ КЕША =====
     RATES_CACHE_TTL_MINUTES: int = 5
+    COINGECKO_CACHE_TTL: int = 60  # секунд; повторный запрос к CoinGecko в этот интервал берется с диска
     MAX_CACHE_PAIRS: int = 100
 
     # ===== МЕТОДЫ ДЛЯ ПОЛУЧЕНИЯ ПОЛНЫХ URL =====
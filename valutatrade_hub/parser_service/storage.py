@@ -3,12 +3,14 @@
 Теперь с атомарной записью и новым форматом exchange_rates.json.
 """
 
+import heapq
 import json
 import os
 import tempfile
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from ..logging_config import get_logger
 from .config import config
@@ -16,12 +18,27 @@ from .config import config
 logger = get_logger(__name__)
 
 
+def _copy_record(record: Dict) -> Dict:
+    """
+    Копирует запись истории вместе с ее вложенными словарями (meta).
+
+    Args:
+        record: Запись из exchange_rates.json.
+
+    Returns:
+        Dict: Независимая копия записи.
+    """
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in record.items()}
+
+
 class ExchangeRatesStorage:
     """Класс для работы с хранилищем курсов валют."""
 
     def __init__(self):
         self.exchange_rates_file = config.HISTORY_FILE_PATH
         self.rates_cache_file = config.RATES_FILE_PATH
+        # Последний разобранный exchange_rates.json и отпечаток файла (mtime, размер, inode)
+        self._history_cache: Optional[Tuple[Tuple[int, int, int], Dict]] = None
         self._ensure_directories()
 
     def _ensure_directories(self) -> None:
@@ -102,25 +119,63 @@ class ExchangeRatesStorage:
             logger.error(f"Ошибка атомарной записи в {file_path}: {e}")
             return False
 
-    def load_exchange_rates(self) -> Dict:
+    def history_fingerprint(self) -> Optional[Tuple[int, int, int]]:
         """
-        Загружает исторические курсы из файла в новом формате.
+        Возвращает отпечаток файла истории, по которому проверяется актуальность кэша.
 
         Returns:
-            Словарь с историческими курсами в формате {id: record}.
+            Кортеж (mtime в наносекундах, размер, inode) или None, если файл недоступен.
         """
         try:
-            if os.path.exists(self.exchange_rates_file):
+            stat = os.stat(self.exchange_rates_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def load_exchange_rates_view(self) -> Mapping[str, Dict]:
+        """
+        Возвращает исторические курсы только для чтения, без копирования.
+
+        Повторный вызов для неизмененного файла не разбирает JSON заново:
+        результат берется из кэша, привязанного к mtime, размеру и inode файла.
+        Записи общие с кэшем и не должны изменяться вызывающим кодом.
+
+        Returns:
+            Неизменяемое отображение {id: record}.
+        """
+        try:
+            stat = os.stat(self.exchange_rates_file)
+        except FileNotFoundError:
+            logger.debug(f"Файл исторических курсов не найден: {self.exchange_rates_file}")
+            return MappingProxyType({})
+        except OSError as e:
+            logger.error(f"Ошибка загрузки исторических курсов: {e}")
+            return MappingProxyType({})
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if self._history_cache is None or self._history_cache[0] != fingerprint:
+            try:
                 with open(self.exchange_rates_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 logger.debug(f"Загружены исторические курсы из {self.exchange_rates_file}")
-                return data
-            else:
-                logger.debug(f"Файл исторических курсов не найден: {self.exchange_rates_file}")
-                return {}
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Ошибка загрузки исторических курсов: {e}")
-            return {}
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error(f"Ошибка загрузки исторических курсов: {e}")
+                return MappingProxyType({})
+            self._history_cache = (fingerprint, data)
+
+        return MappingProxyType(self._history_cache[1])
+
+    def load_exchange_rates(self) -> Dict:
+        """
+        Загружает исторические курсы из файла в новом формате.
+
+        Возвращает независимую копию (записи и их meta копируются), которую
+        можно изменять. Для чтения без копирования используйте load_exchange_rates_view.
+
+        Returns:
+            Словарь с историческими курсами в формате {id: record}.
+        """
+        return {record_id: _copy_record(record) for record_id, record in self.load_exchange_rates_view().items()}
 
     def save_exchange_rate_record(self, record: Dict) -> bool:
         """
@@ -149,8 +204,8 @@ class ExchangeRatesStorage:
                 if field not in record:
                     raise ValueError(f"Отсутствует обязательное поле: {field}")
 
-            # Загружаем существующие данные
-            existing_data = self.load_exchange_rates()
+            # Загружаем существующие данные (новый словарь верхнего уровня, записи не меняются)
+            existing_data = dict(self.load_exchange_rates_view())
 
             # Добавляем новую запись (или заменяем существующую с таким же ID)
             record_id = record['id']
@@ -268,7 +323,7 @@ class ExchangeRatesStorage:
             Словарь с последними курсами для каждой валюты.
         """
         try:
-            historical_data = self.load_exchange_rates()
+            historical_data = self.load_exchange_rates_view()
             latest_rates = {}
 
             # Группируем записи по паре валют
@@ -294,7 +349,7 @@ class ExchangeRatesStorage:
                     "rate": record["rate"],
                     "timestamp": record["timestamp"],
                     "source": record["source"],
-                    "meta": record.get("meta", {})
+                    "meta": dict(record.get("meta", {}))
                 }
 
             return latest_rates
@@ -321,23 +376,25 @@ class ExchangeRatesStorage:
             Список исторических записей курса, отсортированных по времени (новые первыми).
         """
         try:
-            historical_data = self.load_exchange_rates()
-            history = []
-
-            # Фильтруем записи по паре валют
-            for _record_id, record in historical_data.items():
-                if (record['from_currency'].upper() == from_currency.upper() and
-                    record['to_currency'].upper() == to_currency.upper()):
-                    history.append(record)
-
-            # Сортируем по времени (новые первыми)
-            history.sort(
-                key=lambda x: datetime.fromisoformat(x['timestamp'].replace('Z', '+00:00')),
-                reverse=True
+            historical_data = self.load_exchange_rates_view()
+            from_currency = from_currency.upper()
+            to_currency = to_currency.upper()
+
+            # Фильтруем записи по паре валют (генератор: промежуточный список не строится)
+            history = (
+                record for record in historical_data.values()
+                if record['from_currency'].upper() == from_currency
+                and record['to_currency'].upper() == to_currency
             )
 
-            # Ограничиваем количество
-            return history[:limit]
+            # Берем limit самых новых записей: в памяти держится не больше limit элементов
+            newest = heapq.nlargest(
+                limit,
+                history,
+                key=lambda x: datetime.fromisoformat(x['timestamp'].replace('Z', '+00:00'))
+            )
+            # Копируются только выбранные записи: общий кэш истории остается неизменным
+            return [_copy_record(record) for record in newest]
 
         except Exception as e:
             logger.error(f"Ошибка получения истории курса для {from_currency}→{to_currency}: {e}")
@@ -354,7 +411,7 @@ class ExchangeRatesStorage:
             Количество удаленных записей.
         """
         try:
-            historical_data = self.load_exchange_rates()
+            historical_data = self.load_exchange_rates_view()
             if not historical_data:
                 return 0
 
@@ -4,6 +4,7 @@
 Обновлен для соответствия требованиям задачи 5.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Optional
 
@@ -40,17 +41,24 @@ class RatesUpdater:
         self.storage = storage or ExchangeRatesStorage()
         self.last_update_time: Optional[datetime] = None
 
-    def run_update(self) -> Dict:
+    def run_update(self, preloaded_crypto_rates: Optional[Dict[str, float]] = None,
+                   use_cache: bool = True) -> Dict:
         """
         Основной метод обновления курсов.
 
         Последовательность действий:
-        1. Вызывает fetch_rates() у каждого клиента
+        1. Вызывает fetch_rates() у каждого клиента (запросы выполняются параллельно)
         2. Объединяет полученные словари с курсами в один
         3. Добавляет метаданные: source, last_refresh
         4. Передает итоговый объект в storage для сохранения
         5. Ведет подробное логирование каждого шага
 
+        Args:
+            preloaded_crypto_rates: Уже полученный ответ CoinGeckoClient.fetch_rates()
+                ({crypto_USD: rate}); если передан, повторный запрос к CoinGecko не выполняется.
+            use_cache: Разрешить взять ответ CoinGecko из дискового кеша
+                (False — принудительный запрос к API).
+
         Returns:
             Dict: Итоговый объект с курсами в формате для data/rates.json
 
@@ -68,9 +76,17 @@ class RatesUpdater:
         total_failed = 0
 
         try:
-            # 1. Получение курсов криптовалют
+            # Запросы к CoinGecko и ExchangeRate-API независимы: ожидаем их одновременно
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                crypto_future = executor.submit(
+                    self._fetch_crypto_rates_safe, preloaded_crypto_rates, use_cache
+                )
+                fiat_future = executor.submit(self._fetch_fiat_rates_safe)
+                crypto_rates = crypto_future.result()
+                fiat_rates = fiat_future.result()
+
+            # 1. Курсы криптовалют
             logger.info("📈 Шаг 1: Получение курсов криптовалют...")
-            crypto_rates = self._fetch_crypto_rates_safe()
             total_successful += 1 if crypto_rates else 0
             total_failed += 0 if crypto_rates else 1
 
@@ -80,9 +96,8 @@ class RatesUpdater:
             else:
                 logger.warning("❌ Не удалось получить курсы криптовалют")
 
-            # 2. Получение курсов фиатных валют
+            # 2. Курсы фиатных валют
             logger.info("💵 Шаг 2: Получение курсов фиатных валют...")
-            fiat_rates = self._fetch_fiat_rates_safe()
             total_successful += 1 if fiat_rates else 0
             total_failed += 0 if fiat_rates else 1
 
@@ -141,17 +156,25 @@ class RatesUpdater:
             logger.error(f"💥 Критическая ошибка при обновлении курсов: {e}", exc_info=True)
             raise
 
-    def _fetch_crypto_rates_safe(self) -> Dict:
+    def _fetch_crypto_rates_safe(self, preloaded: Optional[Dict[str, float]] = None,
+                                 use_cache: bool = True) -> Dict:
         """
         Безопасное получение курсов криптовалют.
 
+        Args:
+            preloaded: Уже полученные курсы в формате fetch_rates() (запрос не выполняется).
+            use_cache: Разрешить взять ответ CoinGecko из дискового кеша.
+
         Возвращает:
             Dict: Словарь с курсами криптовалют в формате {currency: rate_info}
         """
         try:
-            logger.debug("Запрос к CoinGecko API...")
-            # Используем новый метод fetch_rates() для получения стандартизированного формата
-            crypto_rates_raw = self.crypto_client.fetch_rates()
+            if preloaded is not None:
+                crypto_rates_raw = preloaded
+            else:
+                logger.debug("Запрос к CoinGecko API...")
+                # Используем новый метод fetch_rates() для получения стандартизированного формата
+                crypto_rates_raw = self.crypto_client.fetch_rates(use_cache=use_cache)
 
             if not crypto_rates_raw:
                 logger.warning("CoinGecko API вернул пустой ответ")
@@ -339,16 +362,19 @@ class RatesUpdater:
 
     # ===== Методы для обратной совместимости =====
 
-    def update_all_rates(self) -> Dict:
+    def update_all_rates(self, preloaded_crypto_rates: Optional[Dict[str, float]] = None) -> Dict:
         """
         Старый метод для обратной совместимости.
         Вызывает run_update() и возвращает результат.
 
+        Args:
+            preloaded_crypto_rates: Уже полученные курсы криптовалют (см. run_update).
+
         Returns:
             Dict: Все обновленные курсы.
         """
         logger.warning("Метод update_all_rates() устарел. Используйте run_update()")
-        return self.run_update()
+        return self.run_update(preloaded_crypto_rates)
 
     def force_update(self) -> Dict:
         """
@@ -370,12 +396,13 @@ class RatesUpdater:
         latest_rates = self.storage.get_latest_rates()
 
         # Получаем статистику по историческим данным
-        historical_data = self.storage.load_exchange_rates()
+        historical_data = self.storage.load_exchange_rates_view()
 
         status = {
             "last_update": self.last_update_time.isoformat() if self.last_update_time else None,
             "latest_currencies": len(latest_rates),
             "total_records": len(historical_data),  # Добавлено для исправления ошибки
+            "first_record_id": next(iter(historical_data), None),
             "currencies": list(latest_rates.keys()),
             "sources": set(info.get("source", "Unknown") for info in latest_rates.values()),
             "formats": {
@@ -393,7 +420,7 @@ class RatesUpdater:
         Returns:
             Dict: Статистика исторических данных.
         """
-        historical_data = self.storage.load_exchange_rates()
+        historical_data = self.storage.load_exchange_rates_view()
 
         if not historical_data:
             return {"message": "Нет исторических данных"}